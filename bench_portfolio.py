@@ -0,0 +1,611 @@
+"""
+Benchmark harness for portfolio_fastapi_final3.
+
+Run:
+    pip install httpx
+    python bench_portfolio.py                         # in-process (httpx ASGI transport)
+    python bench_portfolio.py --mode uvicorn          # real uvicorn server on --port
+    python bench_portfolio.py --scenarios / mixed --concurrency 64 --duration 10
+    python bench_portfolio.py --save results.json --baseline baseline.json
+    python bench_portfolio.py --mode micro            # storage, search, sitemap, memory, spam scoring
+    python bench_portfolio.py --mode scaling --scenarios / --max-workers 8 --clients 8
+                                                      # GET / throughput with 1, 2, 4, 8 uvicorn workers
+
+Scenarios:
+    /, /resume, /health  GET loops against one route (any path works, e.g. /sitemap.xml for crawler hits)
+    mixed                GET / and GET /api/feedback with --write-ratio POST /api/feedback
+
+Notes:
+- Every run works in a fresh temporary directory, so submissions, outbox and caches never touch the repo.
+- A local fake SMTP server is started and the app is pointed at it (plain text, no auth),
+  so feedback posts exercise the full mail path.
+- Reports requests/s, p50/p95/p99 latency (ms), errors and RSS per scenario.
+  --save writes JSON; --baseline compares against an earlier --save and prints deltas.
+- Scaling mode drives the server from --clients separate processes so the load generator
+  is not the bottleneck; give it at least as many cores as the server gets.
+"""
+import argparse
+import asyncio
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_MODULE = "portfolio_fastapi_final3"
+
+# ---------- Fake SMTP server ----------
+class FakeSMTPServer:
+    """
+    Minimal plain-text SMTP sink (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT)
+    running on its own event loop thread. `delay` is added before every reply
+    and `fail_rate` answers that share of DATA commands with a 451.
+    """
+    def __init__(self, delay: float = 0.0, fail_rate: float = 0.0):
+        self.delay = delay
+        self.fail_rate = fail_rate
+        self.port = None
+        self.received = 0
+        self.failed = 0
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, "127.0.0.1", 0))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _reply(self, writer, line: bytes):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        writer.write(line)
+        await writer.drain()
+
+    async def _handle(self, reader, writer):
+        try:
+            await self._reply(writer, b"220 fake ESMTP\r\n")
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                cmd = line[:4].upper()
+                if cmd == b"EHLO":
+                    await self._reply(writer, b"250-fake\r\n250 8BITMIME\r\n")
+                elif cmd == b"DATA":
+                    await self._reply(writer, b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    if random.random() < self.fail_rate:
+                        self.failed += 1
+                        await self._reply(writer, b"451 Temporary failure\r\n")
+                    else:
+                        self.received += 1
+                        await self._reply(writer, b"250 OK queued\r\n")
+                elif cmd == b"QUIT":
+                    await self._reply(writer, b"221 Bye\r\n")
+                    break
+                else:
+                    await self._reply(writer, b"250 OK\r\n")
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def start(self) -> "FakeSMTPServer":
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        async def shutdown():
+            self._server.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._loop.stop()
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop)
+        self._thread.join(timeout=5)
+
+# ---------- Helpers ----------
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+def rss_mb(pid: int = None) -> float:
+    """Current RSS of `pid` (Linux /proc), falling back to this process's peak RSS."""
+    try:
+        with open(f"/proc/{pid or os.getpid()}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def app_env(smtp_port: int) -> dict:
+    """Environment for the app under test: fake SMTP, no rate limiting or duplicate suppression."""
+    return {
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(smtp_port),
+        "SMTP_USER": "bench@example.com",
+        "SMTP_STARTTLS": "0",
+        "FEEDBACK_RATE_PER_MIN": "100000000",
+        "FEEDBACK_RATE_BURST": "100000000",
+        "FEEDBACK_DUPLICATE_WINDOW": "0",
+        "FEEDBACK_QUEUE_MAX": "100000",
+    }
+
+_counter = itertools.count()
+
+def feedback_payload() -> dict:
+    n = next(_counter)
+    return {"name": f"Bench {n}", "email": f"bench{n}@example.com", "message": f"Benchmark message {n} {random.random()}"}
+
+# ---------- Load generator ----------
+async def drive(client, scenario: str, concurrency: int, duration: float, write_ratio: float) -> dict:
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def one_request():
+        if scenario != "mixed":
+            return await client.get(scenario)
+        roll = random.random()
+        if roll < write_ratio:
+            return await client.post("/api/feedback", json=feedback_payload())
+        if roll < write_ratio + (1 - write_ratio) / 2:
+            return await client.get("/api/feedback")
+        return await client.get("/")
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                resp = await one_request()
+                await resp.aread()
+                if resp.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+async def run_asgi(args, smtp: FakeSMTPServer) -> dict:
+    import httpx
+    os.environ.update(app_env(smtp.port))
+    sys.path.insert(0, HERE)
+    app_module = __import__(APP_MODULE)
+    app = app_module.app
+    results = {}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for scenario in args.scenarios:
+                res = await drive(client, scenario, args.concurrency, args.duration, args.write_ratio)
+                res["rss_mb"] = rss_mb()
+                results[scenario] = res
+    return results
+
+def start_uvicorn(args, smtp: FakeSMTPServer, workers: int):
+    import httpx
+    port = args.port or free_port()
+    env = dict(os.environ, **app_env(smtp.port), PYTHONPATH=HERE)
+    cmd = [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--host", "127.0.0.1", "--port", str(port),
+           "--log-level", "warning"]
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+    proc = subprocess.Popen(cmd, env=env)
+    for _ in range(600):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health")
+            return proc, port
+        except httpx.TransportError:
+            time.sleep(0.05)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+def stop_uvicorn(proc):
+    proc.terminate()
+    proc.wait(timeout=30)
+
+async def run_uvicorn(args, smtp: FakeSMTPServer) -> dict:
+    import httpx
+    proc, port = start_uvicorn(args, smtp, args.workers)
+    results = {}
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            for scenario in args.scenarios:
+                res = await drive(client, scenario, args.concurrency, args.duration, args.write_ratio)
+                res["rss_mb"] = rss_mb(proc.pid)
+                results[scenario] = res
+    finally:
+        stop_uvicorn(proc)
+    return results
+
+# ---------- Multi-worker scaling ----------
+def client_process(port: int, scenario: str, concurrency: int, duration: float, write_ratio: float) -> dict:
+    import httpx
+
+    async def go():
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30) as client:
+            return await drive(client, scenario, concurrency, duration, write_ratio)
+    return asyncio.run(go())
+
+def run_scaling(args, smtp: FakeSMTPServer) -> dict:
+    """Throughput per scenario for 1, 2, 4, ... --max-workers uvicorn workers, load from --clients processes."""
+    counts = [n for n in (1, 2, 4, 8, 16, 32) if n <= args.max_workers]
+    per_client = max(1, args.concurrency // args.clients)
+    results = {}
+    with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+        for workers in counts:
+            proc, port = start_uvicorn(args, smtp, workers)
+            try:
+                for scenario in args.scenarios:
+                    parts = pool.starmap(client_process, [(port, scenario, per_client, args.duration, args.write_ratio)] * args.clients)
+                    requests = sum(r["requests"] for r in parts)
+                    results[f"{scenario} x{workers}"] = {
+                        "requests": requests,
+                        "errors": sum(r["errors"] for r in parts),
+                        "rps": sum(r["rps"] for r in parts),
+                        # client-side percentiles are per process; report the worst
+                        "p50_ms": max(r["p50_ms"] for r in parts),
+                        "p95_ms": max(r["p95_ms"] for r in parts),
+                        "p99_ms": max(r["p99_ms"] for r in parts),
+                        "rss_mb": rss_mb(proc.pid),
+                    }
+            finally:
+                stop_uvicorn(proc)
+    for scenario in args.scenarios:
+        base = results[f"{scenario} x1"]["rps"]
+        for workers in counts:
+            res = results[f"{scenario} x{workers}"]
+            res["speedup"] = res["rps"] / base if base else 0.0
+    return results
+
+# ---------- Micro-benchmarks ----------
+def micro_storage(app_module, stored: int = 100_000, writes: int = 2_000) -> dict:
+    """Per-append cost of the feedback log when empty vs. with `stored` records already on disk."""
+    out = {}
+    for label, preload in (("empty", 0), (f"{stored}", stored)):
+        path = f"bench-{label}.jsonl"
+        line = app_module.encode_record({"name": "n", "email": "e@example.com", "message": "m" * 80,
+                                         "_received_at": "2024-01-01T00:00:00Z", "ts": "2024-01-01 00:00 UTC"})
+        with open(path, "wb") as f:
+            f.write(line * preload)
+        log = app_module.FeedbackLog(path)
+        start = time.perf_counter()
+        for i in range(writes):
+            log.append({"name": f"n{i}", "email": "", "message": "m" * 80})
+        log.close()
+        out[f"append_us_{label}"] = (time.perf_counter() - start) / writes * 1e6
+    return out
+
+def micro_search(app_module, projects: int = 100_000, queries: int = 200) -> dict:
+    """ProjectIndex lookups (cold and cached) vs. a linear scan over a synthetic catalog."""
+    words = ["data", "sales", "dashboard", "model", "forecast", "vision", "crm", "health",
+             "traffic", "cluster", "python", "deep", "graph", "retail", "survey"]
+    rnd = random.Random(7)
+    catalog = [{"id": f"p{i}", "title": " ".join(rnd.choices(words, k=3)) + f" item{i}",
+                "summary": " ".join(rnd.choices(words, k=8)), "tags": rnd.sample(words, 2),
+                "year": str(2015 + i % 10)} for i in range(projects)]
+    start = time.perf_counter()
+    index = app_module.ProjectIndex(catalog)
+    build = time.perf_counter() - start
+    terms = [f"item{rnd.randrange(projects)}" for _ in range(queries)]
+    start = time.perf_counter()
+    for q in terms:
+        index.search(q)
+    cold = (time.perf_counter() - start) / queries
+    start = time.perf_counter()
+    for q in terms:
+        index.search(q)
+    cached = (time.perf_counter() - start) / queries
+    tokenize = app_module.tokenize
+    start = time.perf_counter()
+    for q in terms[:5]:
+        [p for p in catalog if any(t.startswith(q) for t in tokenize(p["title"] + " " + p["summary"]))]
+    linear = (time.perf_counter() - start) / 5
+    return {"build_s": build, "lookup_ms_cold": cold * 1e3, "lookup_ms_cached": cached * 1e3,
+            "linear_scan_ms": linear * 1e3}
+
+def micro_sitemap(app_module, hits: int = 10_000) -> dict:
+    """Crawler hits on sitemap.xml: first build (render + compress) vs. cached lookups."""
+    base = "https://example.com"
+    start = time.perf_counter()
+    app_module.SiteFiles(1).get("sitemap", base).variants
+    build = time.perf_counter() - start
+    files = app_module.SiteFiles(1)
+    files.get("sitemap", base).variants
+    start = time.perf_counter()
+    for _ in range(hits):
+        files.get("sitemap", base).select("gzip, br")
+    cached = (time.perf_counter() - start) / hits
+    return {"build_ms": build * 1e3, "cached_hit_us": cached * 1e6}
+
+def micro_feedback_memory(app_module, records: int = 1_000_000) -> dict:
+    """Bytes held by the in-memory feedback list: decoded store dicts vs. FeedbackRecord objects."""
+    import tracemalloc
+    rnd = random.Random(3)
+    people = [(f"Visitor {i}", f"visitor{i}@example.com") for i in range(records // 20)]
+    start = time.time() - records
+    lines = []
+    for i in range(records):
+        name, email = rnd.choice(people)
+        now = datetime.datetime.utcfromtimestamp(start + i + rnd.random())
+        lines.append(app_module.encode_record({"name": name, "email": email, "message": f"Nice portfolio, message {i}",
+                                               "_received_at": now.isoformat() + "Z",
+                                               "ts": now.strftime("%Y-%m-%d %H:%M UTC")}))
+    out = {}
+    dicts = [json.loads(line) for line in lines]
+    start = time.perf_counter()
+    compact = [app_module.FeedbackRecord.from_entry(d) for d in dicts]
+    out["convert_s"] = time.perf_counter() - start
+    start = time.perf_counter()
+    app_module.build_feedbacks_html(compact)
+    out["build_feedbacks_html_ms"] = (time.perf_counter() - start) * 1e3
+    del dicts, compact
+    # allocation tracing is slow, so sizes are measured in a second pass
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    dicts = [json.loads(line) for line in lines]
+    out["dict_list_mb"] = (tracemalloc.get_traced_memory()[0] - base) / 2 ** 20
+    compact = [app_module.FeedbackRecord.from_entry(d) for d in dicts]
+    del dicts
+    out["record_list_mb"] = (tracemalloc.get_traced_memory()[0] - base) / 2 ** 20
+    tracemalloc.stop()
+    return out
+
+def synthetic_feedback(count: int, seed: int = 5):
+    """Labeled toy feedback: varied compliments/questions (ham) and link/offer spam."""
+    rnd = random.Random(seed)
+    topics = ["Power BI dashboard", "sales analysis", "HR analytics project", "resume", "SheGuard app",
+              "cancer detection model", "IPL dashboard", "portfolio design", "Netflix summary"]
+    ham = ["Really liked your {t}, great work!", "Could you share more details about the {t}?",
+           "Hi, I am a recruiter and would like to talk about your {t}.", "The {t} looks clean. How long did it take?",
+           "Nice {t}! Which tools did you use for the visuals?", "Thanks for sharing the {t}, very insightful."]
+    spam = ["BUY cheap followers now!!! visit http://{d}/offer", "Earn $5000 per week from home, click http://{d}",
+            "Crypto investment opportunity, 300% returns guaranteed: {d}", "Best casino bonus, free spins at https://{d}",
+            "SEO services: rank #1 on Google, contact {d} today", "Hot singles near you >>> http://{d} <<<"]
+    domains = ["promo-deal.biz", "get-rich.xyz", "bonus4u.top", "seo-king.info", "clickhere.click"]
+    texts, labels = [], []
+    for i in range(count):
+        is_spam = rnd.random() < 0.3
+        template = rnd.choice(spam if is_spam else ham)
+        msg = template.format(t=rnd.choice(topics), d=rnd.choice(domains)) + f" #{i}"
+        name = f"User{rnd.randrange(5000)}"
+        texts.append(f"{name}\n{name.lower()}@example.com\n{msg}")
+        labels.append(int(is_spam))
+    return texts, labels
+
+def micro_spam(app_module, batch: int = 10_000) -> dict:
+    """Train on synthetic feedback, then time one batched scoring call over `batch` messages."""
+    if app_module.load_numpy() is None:
+        return {}
+    import train_spam_model
+    texts, labels = synthetic_feedback(20_000 + batch)
+    start = time.perf_counter()
+    weights, bias = train_spam_model.train(texts[:20_000], labels[:20_000], epochs=50)
+    trained = time.perf_counter() - start
+    train_spam_model.save_model("bench-spam.npz", weights, bias, (3, 4, 5))
+    model = app_module.SpamModel("bench-spam.npz")
+    model.score(["warm up"])
+    start = time.perf_counter()
+    scores = model.score(texts[20_000:])
+    scored = time.perf_counter() - start
+    start = time.perf_counter()
+    for text in texts[20_000:20_000 + 500]:
+        model.score([text])
+    single = (time.perf_counter() - start) / 500
+    flagged = [s >= app_module.SPAM_THRESHOLD for s in scores]
+    accuracy = sum(f == bool(y) for f, y in zip(flagged, labels[20_000:])) / batch
+    return {"train_s": trained, f"score_{batch}_ms": scored * 1e3, "score_one_at_a_time_ms": single * 1e3,
+            "holdout_accuracy": accuracy}
+
+def micro_related(app_module, projects: int = 100_000, changes: int = 100, lookups: int = 10_000) -> dict:
+    """RelatedProjects over a synthetic catalog: full build, an incremental edit, and per-project lookups."""
+    if app_module.load_numpy() is None:
+        return {}
+    rnd = random.Random(5)
+    vocab = [f"term{i}" for i in range(20_000)]
+    cum = list(itertools.accumulate(1.0 / (i + 1) for i in range(len(vocab))))  # Zipf-like, as in real text
+    tags = [f"tag{i}" for i in range(2_000)]
+    def project(i):
+        return {"id": f"p{i}", "title": " ".join(rnd.choices(vocab, cum_weights=cum, k=4)),
+                "summary": " ".join(rnd.choices(vocab, cum_weights=cum, k=12)), "tags": rnd.sample(tags, 3)}
+    catalog = [project(i) for i in range(projects)]
+    start = time.perf_counter()
+    related = app_module.RelatedProjects(catalog)
+    built = time.perf_counter() - start
+    edited = list(catalog)
+    for i in rnd.sample(range(projects), changes):
+        edited[i] = dict(project(i), id=f"p{i}")
+    start = time.perf_counter()
+    related.update(edited)
+    updated = time.perf_counter() - start
+    ids = [f"p{rnd.randrange(projects)}" for _ in range(lookups)]
+    start = time.perf_counter()
+    for pid in ids:
+        related.related(pid, app_module.RELATED_K)
+    lookup = (time.perf_counter() - start) / lookups
+    return {"build_s": built, f"update_{changes}_ms": updated * 1e3, "lookup_us": lookup * 1e6}
+
+def micro_validation(app_module, payloads: int = 20_000) -> dict:
+    """Feedback parsing: json.loads + FeedbackModel(**dict) vs. one-pass model_validate_json, and body limits."""
+    bodies = [json.dumps(feedback_payload()).encode() for _ in range(payloads)]
+    model = app_module.FeedbackModel
+    start = time.perf_counter()
+    for body in bodies:
+        model(**json.loads(body))
+    two_pass = time.perf_counter() - start
+    start = time.perf_counter()
+    for body in bodies:
+        model.model_validate_json(body)
+    one_pass = time.perf_counter() - start
+
+    async def post(chunks, delay: float = 0.0) -> tuple:
+        """Drive the ASGI app with a chunked body; returns (status, body bytes consumed, seconds)."""
+        consumed = 0
+        status = None
+        pending = list(chunks)
+
+        async def receive():
+            nonlocal consumed
+            if delay:
+                await asyncio.sleep(delay)
+            chunk = pending.pop(0) if pending else b""
+            consumed += len(chunk)
+            return {"type": "http.request", "body": chunk, "more_body": bool(pending)}
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+                 "scheme": "http", "path": "/api/feedback", "raw_path": b"/api/feedback", "query_string": b"",
+                 "root_path": "", "headers": [(b"host", b"bench"), (b"content-type", b"application/json")],
+                 "client": ("127.0.0.1", 1), "server": ("bench", 80)}
+        start = time.perf_counter()
+        await app_module.app(scope, receive, send)
+        return status, consumed, time.perf_counter() - start
+
+    timeout = app_module.FEEDBACK_BODY_TIMEOUT
+    app_module.FEEDBACK_BODY_TIMEOUT = 0.5
+    try:
+        big_status, big_read, big_s = asyncio.run(post([b"x" * 65536] * 80))  # 5 MiB, no Content-Length
+        drip_status, _, drip_s = asyncio.run(post([b" "] * 100, delay=0.05))   # 5 s of one-byte chunks
+    finally:
+        app_module.FEEDBACK_BODY_TIMEOUT = timeout
+    return {"two_pass_us": two_pass / payloads * 1e6, "one_pass_us": one_pass / payloads * 1e6,
+            "oversized_status": big_status, "oversized_read_kb": big_read / 1024, "oversized_ms": big_s * 1e3,
+            "slow_drip_status": drip_status, "slow_drip_s": drip_s}
+
+def micro_page_bytes(app_module) -> dict:
+    """Compressed bytes for a first visit (page + assets) and a repeat visit after the page changed."""
+    def size(body, coding: str = "gzip") -> int:
+        variants = body.variants
+        return len(variants.get(coding, variants["identity"])[0])
+    page = size(app_module.MAIN_PAGE.static())
+    assets = sum(size(asset) for asset in app_module.STATIC_ASSETS.values())
+    # immutable assets are not requested again; only the changed page is downloaded
+    return {"page_identity_bytes": size(app_module.MAIN_PAGE.static(), "identity"), "page_gzip_bytes": page,
+            "first_visit_bytes": page + assets, "repeat_visit_bytes": page}
+
+def run_micro(args) -> dict:
+    sys.path.insert(0, HERE)
+    app_module = __import__(APP_MODULE)
+    return {"storage": micro_storage(app_module), "search": micro_search(app_module),
+            "sitemap": micro_sitemap(app_module), "feedback_memory": micro_feedback_memory(app_module), "spam": micro_spam(app_module),
+            "related": micro_related(app_module), "validation": micro_validation(app_module),
+            "page_bytes": micro_page_bytes(app_module)}
+
+# ---------- Reporting ----------
+def print_results(results: dict, baseline: dict = None):
+    cols = ("rps", "p50_ms", "p95_ms", "p99_ms", "rss_mb")
+    print(f"{'scenario':<12}{'requests':>10}{'errors':>8}" + "".join(f"{c:>12}" for c in cols))
+    for scenario, res in results.items():
+        line = f"{scenario:<12}{res['requests']:>10}{res['errors']:>8}" + "".join(f"{res[c]:>12.2f}" for c in cols)
+        print(line)
+        base = (baseline or {}).get(scenario)
+        if base:
+            deltas = []
+            for c in cols:
+                if base.get(c):
+                    deltas.append(f"{(res[c] - base[c]) / base[c] * 100:>+11.1f}%")
+                else:
+                    deltas.append(f"{'n/a':>12}")
+            print(f"{'  vs base':<30}" + "".join(deltas))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the portfolio app.")
+    parser.add_argument("--mode", choices=("asgi", "uvicorn", "micro", "scaling"), default="asgi")
+    parser.add_argument("--scenarios", nargs="+", default=["/", "/resume", "/health", "mixed"])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of POSTs in the mixed scenario")
+    parser.add_argument("--port", type=int, default=0, help="uvicorn port (default: a free port)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--max-workers", type=int, default=8, help="scaling mode: largest worker count")
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1,
+                        help="scaling mode: load generator processes")
+    parser.add_argument("--smtp-delay", type=float, default=0.0, help="seconds the fake SMTP server waits per reply")
+    parser.add_argument("--smtp-fail-rate", type=float, default=0.0, help="share of messages the fake server rejects")
+    parser.add_argument("--save", help="write results as JSON")
+    parser.add_argument("--baseline", help="compare against a JSON file written by --save")
+    args = parser.parse_args(argv)
+
+    save_path = os.path.abspath(args.save) if args.save else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    smtp = FakeSMTPServer(args.smtp_delay, args.smtp_fail_rate).start()
+    workdir = tempfile.mkdtemp(prefix="portfolio-bench-")
+    os.chdir(workdir)
+    try:
+        if args.mode == "micro":
+            results = run_micro(args)
+        elif args.mode == "scaling":
+            results = run_scaling(args, smtp)
+        else:
+            runner = run_asgi if args.mode == "asgi" else run_uvicorn
+            results = asyncio.run(runner(args, smtp))
+    finally:
+        smtp.stop()
+
+    baseline = None
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    print(f"mode={args.mode} concurrency={args.concurrency} duration={args.duration}s workdir={workdir}")
+    if args.mode == "micro":
+        for group, values in results.items():
+            base = (baseline or {}).get(group, {})
+            for key, value in values.items():
+                delta = f"  ({(value - base[key]) / base[key] * 100:+.1f}% vs base)" if base.get(key) else ""
+                print(f"{group + '.' + key:<32}{value:>14.4f}{delta}")
+    else:
+        print_results(results, baseline)
+        if args.mode == "scaling":
+            for scenario, res in results.items():
+                print(f"{scenario:<12} speedup {res['speedup']:.2f}x")
+        print(f"fake SMTP: {smtp.received} received, {smtp.failed} rejected")
+    if save_path:
+        meta = {k: v for k, v in vars(args).items() if k not in ("save", "baseline")}
+        with open(save_path, "w", encoding="utf-8") as f:
+            json.dump({"config": meta, "results": results}, f, indent=2)
+
+if __name__ == "__main__":
+    main()
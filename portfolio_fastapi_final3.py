@@ -5,6 +5,10 @@ Run:
     pip install fastapi uvicorn pydantic
     python portfolio_fastapi_final3.py
 
+Tests:
+    pip install -r requirements-dev.txt
+    python -m pytest tests
+
 Open:
     http://127.0.0.1:8000
 
@@ -16,24 +20,134 @@ Notes:
     SMTP_HOST (optional, default smtp.gmail.com if SMTP_USER endswith @gmail.com)
     SMTP_PORT (optional, default 587)
     SMTP_USER
-    SMTP_PASS
+    SMTP_PASS (optional; AUTH is skipped without it)
+    SMTP_STARTTLS (optional, default 1; set 0 for a local plain-text test server)
     CONTACT_RECEIVER (optional, defaults to SMTP_USER or divyatoshupadhyay@gmail.com)
+- Feedback is stored append-only in submissions.jsonl (an existing submissions.json is migrated once):
+    SUBMISSIONS_LOG (optional, default submissions.jsonl)
+    FEEDBACK_FSYNC_BATCH / FEEDBACK_FSYNC_INTERVAL (optional, default 16 records / 1.0 s)
+- Storage backend: FEEDBACK_BACKEND=jsonl (default) or sqlite (WAL; always used when WEB_CONCURRENCY > 1)
+    FEEDBACK_DB (optional, default submissions.db; an existing JSON Lines log is imported once)
+    FEEDBACK_SYNC_INTERVAL (optional, default 1.0 s between picking up other workers' submissions)
+- Abuse protection on POST /api/feedback:
+    FEEDBACK_RATE_PER_MIN / FEEDBACK_RATE_BURST (optional, default 5 per minute, bursts of 3, per client IP
+      and worker)
+    TRUSTED_PROXIES (optional, comma-separated proxy IPs or CIDR ranges, e.g. 10.0.0.0/8, whose
+      X-Forwarded-For is honoured; list the platform router's range when its addresses change)
+    RATE_LIMIT_MAX_CLIENTS (optional, default 10000 tracked clients)
+    FEEDBACK_DUPLICATE_WINDOW / FEEDBACK_DUPLICATE_CACHE_SIZE (optional, default 3600 s / 4096 messages;
+      the same message from the same client within the window answers 409)
+    FEEDBACK_MAX_BYTES (optional, default 16384; larger bodies answer 413 without being read in full)
+    FEEDBACK_MESSAGE_MAX (optional, default 5000 characters per message)
+    FEEDBACK_BODY_TIMEOUT (optional, default 10 s for the whole body to arrive; slower answers 408)
+    Only Content-Type: application/json is accepted (415 otherwise).
+- Submissions are answered immediately and persisted/emailed by a background worker:
+    FEEDBACK_QUEUE_MAX (optional, default 256; a full queue answers 429)
+    FEEDBACK_DRAIN_TIMEOUT (optional, default 10 s to flush the queue on shutdown)
+    FEEDBACK_EMBED_RECENT (optional, default 20 entries rendered into the page; the rest via GET /api/feedback?cursor=&limit=)
+- Projects, skills and certificates can be overridden from a JSON file that is reloaded on change:
+    CONTENT_FILE (optional, default content.json; keys projects, skills_technical, skills_tools,
+                  certificates, additional_achievements; a section with the wrong shape is
+                  ignored with a message, and project github links must be http(s))
+    CONTENT_POLL_INTERVAL (optional, default 5 s)
+- GET /api/feedback/export?format=ndjson|csv&since= streams all feedback (gzip if accepted):
+    EXPORT_TOKEN (required to enable it; send "Authorization: Bearer <token>")
+- SITE_URL (optional, e.g. https://example.com): absolute base for sitemap.xml and robots.txt; without it the
+  request's Host (or X-Forwarded-Proto/-Host from TRUSTED_PROXIES) is used.
+- The page's CSS and JS are served as /static/app.<hash>.css|js (hash of the content) with
+  Cache-Control: public, max-age=31536000, immutable; the page itself stays no-cache.
+- /resume.pdf is rendered once with WeasyPrint when installed and cached in RESUME_PDF_DIR (default .cache).
+- Emails are queued in a durable outbox and sent over one reused SMTP connection:
+    MAIL_OUTBOX_DIR (optional, default outbox)
+    MAIL_IDLE_TIMEOUT (optional, default 60 s before an idle connection is closed)
+    MAIL_DIGEST_THRESHOLD / MAIL_DIGEST_WINDOW (optional, default 5 per 60 s; beyond that, send digests)
+    MAIL_MAX_ATTEMPTS / MAIL_BACKOFF_BASE / MAIL_BACKOFF_MAX (optional, default 8 / 5 s / 900 s)
+    MAIL_SEND_DEADLINE (optional, default 20 s for connect + send of one message)
+    MAIL_BREAKER_THRESHOLD / MAIL_BREAKER_COOLDOWN (optional, default 3 failures / 300 s pause)
+    GET /api/mail/status shows breaker state, outbox size and queue depth.
+- Spam scoring (needs numpy and a model from train_spam_model.py): SPAM_MODEL_FILE (optional, default
+  spam_model.npz), SPAM_THRESHOLD (optional, default 0.9). Submissions scoring at or above it are stored
+  with "held": true and are neither shown nor emailed. FEEDBACK_BATCH_MAX (optional, default 64) queued
+  submissions are scored together.
+- Multi-worker serving: WEB_CONCURRENCY (optional, default 1) worker processes for `python portfolio_fastapi_final3.py`
+  and the Procfile. Workers share feedback through the store, the rendered page through SHARED_PAGE_FILE
+  (default .cache/main_page.shm, SHARED_PAGE_CAPACITY default 8 MiB; empty disables it), and only one of them
+  drains the mail outbox, rescanning it every MAIL_OUTBOX_POLL (default 2 s) for the others' messages.
+  Set WEB_CONCURRENCY rather than passing --workers to uvicorn directly, so each worker knows it is not alone.
+  The rate limiter and duplicate filter are kept per worker: with N workers a client may get up to N times
+  FEEDBACK_RATE_PER_MIN / FEEDBACK_RATE_BURST, and a repeat reaching another worker is not answered 409.
 """
+import asyncio
+import atexit
+import base64
+import bisect
+import collections
+import csv
 import json
 import datetime
+import mmap
+import gzip
+import hashlib
+import heapq
+import hmac
+import importlib.util
+import io
+import ipaddress
 import os
-import smtplib
-from email.message import EmailMessage
+import random
+import re
+import socket
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from contextlib import asynccontextmanager, contextmanager
 from typing import List, Optional
 from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse, Response
-from pydantic import BaseModel, EmailStr, ValidationError
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, EmailStr, Field, ValidationError, field_validator
 import uvicorn
 
-app = FastAPI(title="Divytosh Upadhyay — Portfolio (with SMTP)")
+try:
+    import brotli  # optional: adds a "br" variant to precompressed responses
+except ImportError:
+    brotli = None
+
+# numpy (optional: spam scoring and related projects) is imported by load_numpy() on first use
+np = None
+
+try:
+    import fcntl  # POSIX only; without it every process acts as the only worker
+except ImportError:
+    fcntl = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await MAILER.start()
+    await start_feedback_worker()
+    feedback_loader = asyncio.create_task(load_feedbacks())
+    related_loader = asyncio.create_task(load_related_projects())
+    content_watcher = asyncio.create_task(watch_content())
+    feedback_watcher = asyncio.create_task(watch_feedbacks())
+    store_flusher = asyncio.create_task(flush_feedback_store())
+    try:
+        yield
+    finally:
+        feedback_loader.cancel()
+        related_loader.cancel()
+        content_watcher.cancel()
+        feedback_watcher.cancel()
+        store_flusher.cancel()
+        await stop_feedback_worker()
+        await MAILER.stop()
+
+app = FastAPI(title="Divytosh Upadhyay — Portfolio (with SMTP)", lifespan=lifespan)
 
 # ---------- Configuration ----------
-SUBMISSIONS_FILE = "submissions.json"
+SUBMISSIONS_FILE = "submissions.json"  # legacy format, migrated to SUBMISSIONS_LOG
 DISPLAY_EMAIL = "divyatoshupadhyay@gmail.com"  # user-provided Gmail (assumed)
 
 # SMTP config (optional). Set these as environment variables to enable email forwarding.
@@ -50,26 +164,517 @@ if SMTP_USER and SMTP_USER.lower().endswith("@gmail.com"):
     if not SMTP_PORT:
         SMTP_PORT = 587
 
+# Public base URL for sitemap.xml / robots.txt; derived from the request when unset
+SITE_URL = os.environ.get("SITE_URL", "").rstrip("/")
+
+# uvicorn worker processes when started through __main__ or the Procfile
+WEB_CONCURRENCY = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+
+# ---------- Metrics ----------
+# Prometheus-style metrics kept in plain preallocated lists/dicts; rendering
+# to text only happens when /metrics is scraped.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> List[str]:
+        sep = "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.total}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+REQUEST_LATENCY = {}                         # (method, route) -> Histogram
+REQUEST_COUNT = collections.Counter()        # (method, route, status) -> n
+FEEDBACK_EVENTS = collections.Counter()      # (event, reason) -> n
+STAGE_LATENCY = {"storage": Histogram(STAGE_BUCKETS), "smtp": Histogram(STAGE_BUCKETS),
+                 "spam": Histogram(STAGE_BUCKETS)}
+
+# h11 accepts any method token; anything else is counted as "other" so labels stay bounded
+METRIC_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+class MetricsMiddleware:
+    """Pure ASGI middleware timing every HTTP request per matched route."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            method = scope["method"] if scope["method"] in METRIC_METHODS else "other"
+            key = (method, route.path if route is not None else "unmatched")
+            hist = REQUEST_LATENCY.get(key)
+            if hist is None:
+                hist = REQUEST_LATENCY[key] = Histogram(LATENCY_BUCKETS)
+            hist.observe(time.perf_counter() - start)
+            REQUEST_COUNT[key + (status[0],)] += 1
+
+app.add_middleware(MetricsMiddleware)
+
 # ---------- Persistence ----------
-def load_submissions() -> List[dict]:
+# Submissions are stored as an append-only JSON Lines log. The legacy
+# SUBMISSIONS_FILE (one JSON array rewritten on every post) is migrated once.
+SUBMISSIONS_LOG = os.environ.get("SUBMISSIONS_LOG", "submissions.jsonl")
+FSYNC_BATCH = int(os.environ.get("FEEDBACK_FSYNC_BATCH", "16"))
+FSYNC_INTERVAL = float(os.environ.get("FEEDBACK_FSYNC_INTERVAL", "1.0"))
+
+def encode_record(entry: dict) -> bytes:
+    # json.dumps escapes newlines inside strings, so one record is always one line
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+class FeedbackLog:
+    """
+    Append-only JSON Lines store. Each save is one write() of one line, so the
+    cost per submission does not depend on how many are already stored.
+    fsync is batched: every FSYNC_BATCH records or FSYNC_INTERVAL seconds, and
+    flush_feedback_store calls sync() on that interval so a record followed by
+    quiet is not left waiting for the next append.
+    """
+    def __init__(self, path: str, legacy_path: Optional[str] = None):
+        self.path = path
+        self.records = 0
+        self.garbage = 0
+        self._lock = threading.Lock()
+        self._fh = None
+        self._pending = 0
+        self._offset = 0
+        self._last_sync = time.monotonic()
+        with self._startup_lock():
+            if legacy_path:
+                self._migrate(legacy_path)
+            self._recover_tail()
+
+    @contextmanager
+    def _startup_lock(self):
+        # Workers starting together would otherwise migrate and repair the same file at once.
+        fd = None
+        if fcntl is not None:
+            try:
+                fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            except OSError:
+                if fd is not None:
+                    os.close(fd)
+                fd = None
+        try:
+            yield
+        finally:
+            if fd is not None:
+                os.close(fd)
+
+    def _migrate(self, legacy_path: str):
+        # checked under the startup lock, so only the first worker migrates
+        if os.path.exists(self.path) or not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r", encoding="utf-8") as f:
+                arr = json.load(f)
+        except Exception:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for entry in arr:
+                f.write(encode_record(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        try:
+            os.replace(legacy_path, legacy_path + ".migrated")
+        except FileNotFoundError:
+            pass  # another worker got there first (only possible without fcntl)
+
+    def _recover_tail(self):
+        """
+        A crash mid-write can leave a torn last record without its newline.
+        Keep it if it still parses, otherwise truncate back to the last full line.
+        """
+        try:
+            with open(self.path, "r+b") as f:
+                size = f.seek(0, os.SEEK_END)
+                if size == 0:
+                    return
+                f.seek(size - 1)
+                if f.read(1) == b"\n":
+                    return
+                pos = size
+                tail = b""
+                while pos > 0 and b"\n" not in tail:
+                    step = min(4096, pos)
+                    pos -= step
+                    f.seek(pos)
+                    tail = f.read(step) + tail
+                cut = tail.rfind(b"\n") + 1
+                try:
+                    json.loads(tail[cut:])
+                    f.seek(size)
+                    f.write(b"\n")
+                except ValueError:
+                    f.truncate(pos + cut)
+        except FileNotFoundError:
+            pass
+
+    def load_all(self) -> List[dict]:
+        out = []
+        garbage = 0
+        offset = 0
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if line.endswith(b"\n"):
+                        offset += len(line)
+                    try:
+                        out.append(json.loads(line))
+                    except ValueError:
+                        garbage += 1
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.records = len(out)
+            self.garbage = garbage
+            self._offset = offset
+        if garbage:
+            self.compact()
+        return out
+
+    def read_new(self) -> List[dict]:
+        """Records appended (by this or another process) since the last load_all/read_new."""
+        try:
+            if os.path.getsize(self.path) <= self._offset:
+                return []
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        out = []
+        for line in data[:end].splitlines():
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                pass
+        return out
+
+    def position(self) -> int:
+        """How far load_all/read_new have read: equal positions mean the same records were seen."""
+        return self._offset
+
+    def iter_records(self, since: str = "", chunk_size: int = 1000):
+        """Yield lists of up to chunk_size records received at or after `since`, streaming from disk."""
+        chunk = []
+        try:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if since and (entry.get("_received_at") or "") < since:
+                        continue
+                    chunk.append(entry)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+        except FileNotFoundError:
+            pass
+        if chunk:
+            yield chunk
+
+    def append(self, entry: dict):
+        line = encode_record(entry)
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, "ab")
+            self._fh.write(line)
+            self._fh.flush()
+            self.records += 1
+            self._pending += 1
+            now = time.monotonic()
+            if self._pending >= FSYNC_BATCH or now - self._last_sync >= FSYNC_INTERVAL:
+                os.fsync(self._fh.fileno())
+                self._pending = 0
+                self._last_sync = now
+
+    def compact(self):
+        """Rewrite the log without unparseable lines and swap it in atomically."""
+        with self._lock:
+            self._close_locked()
+            tmp = self.path + ".compact"
+            kept = 0
+            with open(self.path, "rb") as src, open(tmp, "wb") as dst:
+                for line in src:
+                    try:
+                        json.loads(line)
+                    except ValueError:
+                        continue
+                    dst.write(line if line.endswith(b"\n") else line + b"\n")
+                    kept += 1
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.replace(tmp, self.path)
+            self.records = kept
+            self.garbage = 0
+            self._offset = os.path.getsize(self.path)
+
+    def sync(self):
+        with self._lock:
+            if self._fh is not None and self._pending:
+                os.fsync(self._fh.fileno())
+                self._pending = 0
+                self._last_sync = time.monotonic()
+
+    def _close_locked(self):
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+            self._pending = 0
+
+    def close(self):
+        with self._lock:
+            self._close_locked()
+
+class SqliteFeedbackStore:
+    """
+    SQLite feedback store for multi-worker deployments. WAL mode lets readers
+    in other workers proceed while one writes; each thread gets its own
+    connection, and the table is indexed on received time and email.
+    Same interface as FeedbackLog.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS submissions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            received_at TEXT NOT NULL,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            message TEXT NOT NULL,
+            ts TEXT NOT NULL,
+            held INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_submissions_received_at ON submissions (received_at);
+        CREATE INDEX IF NOT EXISTS idx_submissions_email ON submissions (email);
+    """
+    INSERT_SQL = "INSERT INTO submissions (received_at, name, email, message, ts, held) VALUES (?, ?, ?, ?, ?, ?)"
+    SELECT_SINCE_SQL = "SELECT id, received_at, name, email, message, ts, held FROM submissions WHERE id > ? ORDER BY id"
+    SELECT_RECEIVED_SQL = ("SELECT id, received_at, name, email, message, ts, held FROM submissions"
+                           " WHERE received_at >= ? ORDER BY id")
+
+    def __init__(self, path: str, import_from: Optional[FeedbackLog] = None):
+        self.path = path
+        self._local = threading.local()
+        self._conns = []
+        self._conns_lock = threading.Lock()
+        self._last_id = 0
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+        if "held" not in {row[1] for row in conn.execute("PRAGMA table_info(submissions)")}:
+            conn.execute("ALTER TABLE submissions ADD COLUMN held INTEGER NOT NULL DEFAULT 0")
+        if import_from is not None:
+            self._import(conn, import_from)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._conns_lock:
+                self._conns.append(conn)
+        return conn
+
+    @staticmethod
+    def _params(entry: dict) -> tuple:
+        return (entry.get("_received_at") or "", entry.get("name") or "Anonymous", entry.get("email") or "",
+                entry.get("message") or "", entry.get("ts") or "", int(bool(entry.get("held"))))
+
+    @staticmethod
+    def _entry(row: tuple) -> dict:
+        entry = {"name": row[2], "email": row[3], "message": row[4], "_received_at": row[1], "ts": row[5]}
+        if row[6]:
+            entry["held"] = True
+        return entry
+
+    def _import(self, conn: sqlite3.Connection, log: FeedbackLog):
+        """One-time copy of an existing JSON Lines log into an empty database."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute("SELECT 1 FROM submissions LIMIT 1").fetchone() is None:
+                conn.executemany(self.INSERT_SQL, (self._params(e) for e in log.load_all()))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def load_all(self) -> List[dict]:
+        rows = self._conn().execute(self.SELECT_SINCE_SQL, (0,)).fetchall()
+        if rows:
+            self._last_id = rows[-1][0]
+        return [self._entry(r) for r in rows]
+
+    def read_new(self) -> List[dict]:
+        rows = self._conn().execute(self.SELECT_SINCE_SQL, (self._last_id,)).fetchall()
+        if rows:
+            self._last_id = rows[-1][0]
+        return [self._entry(r) for r in rows]
+
+    def position(self) -> int:
+        return self._last_id
+
+    def iter_records(self, since: str = "", chunk_size: int = 1000):
+        # A dedicated connection: the consumer may resume this generator on different threads.
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        try:
+            cur = conn.execute(self.SELECT_RECEIVED_SQL, (since,))
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [self._entry(r) for r in rows]
+        finally:
+            conn.close()
+
+    def append(self, entry: dict):
+        self._conn().execute(self.INSERT_SQL, self._params(entry))
+
+    def sync(self):
+        pass
+
+    def close(self):
+        with self._conns_lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+def select_backend(backend: str, workers: int) -> str:
+    # The JSON Lines log assumes a single writer (tail recovery and compaction rewrite
+    # the file), so several workers always use SQLite.
+    if workers > 1 and backend != "sqlite":
+        print(f"WARNING: FEEDBACK_BACKEND={backend} is unsafe with WEB_CONCURRENCY={workers}; "
+              "using FEEDBACK_BACKEND=sqlite instead")
+        return "sqlite"
+    return backend
+
+FEEDBACK_BACKEND = select_backend(os.environ.get("FEEDBACK_BACKEND", "jsonl").lower(), WEB_CONCURRENCY)
+FEEDBACK_DB = os.environ.get("FEEDBACK_DB", "submissions.db")
+
+if FEEDBACK_BACKEND == "sqlite":
+    FEEDBACK_STORE = SqliteFeedbackStore(FEEDBACK_DB, import_from=FeedbackLog(SUBMISSIONS_LOG, legacy_path=SUBMISSIONS_FILE))
+else:
+    FEEDBACK_STORE = FeedbackLog(SUBMISSIONS_LOG, legacy_path=SUBMISSIONS_FILE)
+atexit.register(FEEDBACK_STORE.close)
+
+class FeedbackRecord:
+    """
+    A feedback entry as held in memory: the receive time as one integer
+    (epoch microseconds, None if unknown) from which `received_at` and `ts`
+    are formatted on demand, and interned name/email since the same people
+    tend to write more than once. Stored records keep the full dict format.
+    """
+    __slots__ = ("name", "email", "message", "received")
+    EPOCH = datetime.datetime(1970, 1, 1)
+
+    def __init__(self, name: str, email: str, message: str, received: Optional[int]):
+        self.name = name
+        self.email = email
+        self.message = message
+        self.received = received
+
+    @classmethod
+    def from_entry(cls, entry: dict) -> "FeedbackRecord":
+        received = None
+        try:
+            if entry.get("_received_at"):
+                dt = datetime.datetime.fromisoformat(entry["_received_at"].rstrip("Z"))
+            elif entry.get("ts"):
+                dt = datetime.datetime.strptime(entry["ts"], "%Y-%m-%d %H:%M UTC")
+            else:
+                dt = None
+            if dt is not None:
+                delta = dt.replace(tzinfo=None) - cls.EPOCH
+                received = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+        except (TypeError, ValueError):
+            pass
+        return cls(sys.intern(entry.get("name") or ""), sys.intern(entry.get("email") or ""),
+                   entry.get("message") or "", received)
+
+    def _datetime(self) -> Optional[datetime.datetime]:
+        if self.received is None:
+            return None
+        return self.EPOCH + datetime.timedelta(microseconds=self.received)
+
+    @property
+    def received_at(self) -> str:
+        dt = self._datetime()
+        return dt.isoformat() + "Z" if dt else ""
+
+    @property
+    def ts(self) -> str:
+        dt = self._datetime()
+        return dt.strftime("%Y-%m-%d %H:%M UTC") if dt else ""
+
+def load_submissions() -> List[FeedbackRecord]:
     try:
-        if os.path.exists(SUBMISSIONS_FILE):
-            with open(SUBMISSIONS_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
+        return [FeedbackRecord.from_entry(e) for e in FEEDBACK_STORE.load_all() if not e.get("held")]
     except Exception:
-        pass
-    return []
+        return []
 
 def save_submission(entry: dict):
-    arr = load_submissions()
-    arr.append(entry)
     try:
-        with open(SUBMISSIONS_FILE, "w", encoding="utf-8") as f:
-            json.dump(arr, f, indent=2)
+        FEEDBACK_STORE.append(entry)
     except Exception:
         pass
 
-FEEDBACKS = load_submissions()
+def read_new_submissions() -> List[FeedbackRecord]:
+    try:
+        return [FeedbackRecord.from_entry(e) for e in FEEDBACK_STORE.read_new() if not e.get("held")]
+    except Exception:
+        return []
+
+# Loaded by a background task once the server is up (see load_feedbacks), so a
+# large store doesn't delay the first response.
+FEEDBACKS: List[FeedbackRecord] = []
+
+# Only the most recent entries are embedded in the page; older ones are paged via GET /api/feedback.
+FEEDBACK_EMBED_RECENT = int(os.environ.get("FEEDBACK_EMBED_RECENT", "20"))
+FEEDBACK_CARD_CACHE_SIZE = 1024
+FEEDBACK_PAGE_MAX = 100
+FEEDBACK_PAGE_CACHE_SIZE = 256
 
 # ---------- Content (projects, skills, certs) ----------
 PROJECTS = [
@@ -121,40 +726,746 @@ ADDITIONAL_ACHIEVEMENTS = [
     "Developed a Smart Car (visible in the second image) — perception, control and path logic; required coordination, patience, and technical problem-solving."
 ]
 
+# ---------- Content store ----------
+# The lists above are built-in defaults. CONTENT_FILE (JSON) may override any of
+# them and is polled for changes, so content edits don't need a restart.
+CONTENT_FILE = os.environ.get("CONTENT_FILE", "content.json")
+CONTENT_POLL_INTERVAL = float(os.environ.get("CONTENT_POLL_INTERVAL", "5"))
+
+def content_section_error(key: str, value) -> Optional[str]:
+    """Why a section from CONTENT_FILE cannot be used, or None if it has the shape the page needs."""
+    if not isinstance(value, list):
+        return "expected a list"
+    if key != "projects":
+        return None if all(isinstance(v, str) for v in value) else "expected a list of strings"
+    for i, p in enumerate(value):
+        if not isinstance(p, dict):
+            return f"project {i} is not an object"
+        for field in ("title", "summary"):
+            if not isinstance(p.get(field), str):
+                return f"project {i} needs a string {field!r}"
+        for field in ("id", "github"):
+            if field in p and not isinstance(p[field], str):
+                return f"project {i}: {field!r} must be a string"
+        if "year" in p and not isinstance(p["year"], (str, int)):
+            return f"project {i}: 'year' must be a string or number"
+        if not isinstance(p.get("tags", []), list) or not all(isinstance(t, str) for t in p.get("tags", [])):
+            return f"project {i}: 'tags' must be a list of strings"
+    return None
+
+class ContentStore:
+    """
+    Content sections keyed like the JSON file: projects, skills_technical,
+    skills_tools, certificates, additional_achievements. Sections missing from
+    the file keep their defaults, and a section with the wrong shape keeps its
+    current value (the defaults at startup). `version` increases on every applied change;
+    `modified` is the epoch time of that change (None while on the defaults).
+    """
+    def __init__(self, path: str, defaults: dict):
+        self.path = path
+        self.defaults = defaults
+        self.sections = dict(defaults)
+        self.version = 0
+        self.modified = None
+        self._mtime = None
+
+    def poll(self):
+        """Return (sections, changed_keys) if the file changed since the last commit, else None."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return None
+        data = {}
+        if mtime is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if not isinstance(data, dict):
+                    raise ValueError("expected a JSON object")
+            except Exception as e:
+                print("Could not load", self.path, "-", e)
+                self._mtime = mtime
+                return None
+        sections = {}
+        for key, default in self.defaults.items():
+            value = data.get(key, default)
+            error = content_section_error(key, value)
+            if error:
+                print("Ignoring", key, "in", self.path, "-", error)
+                value = self.sections[key]
+            sections[key] = value
+        changed = {key for key in sections if sections[key] != self.sections[key]}
+        return sections, changed, mtime
+
+    def commit(self, sections: dict, changed: set, mtime):
+        self._mtime = mtime
+        if changed:
+            self.sections = sections
+            self.version += 1
+            self.modified = mtime / 1e9 if mtime is not None else time.time()
+
+CONTENT = ContentStore(CONTENT_FILE, {
+    "projects": PROJECTS,
+    "skills_technical": SKILLS_TECHNICAL,
+    "skills_tools": SKILLS_TOOLS,
+    "certificates": CERTIFICATES,
+    "additional_achievements": ADDITIONAL_ACHIEVEMENTS,
+})
+_polled = CONTENT.poll()
+if _polled:
+    CONTENT.commit(*_polled)
+PROJECTS = CONTENT.sections["projects"]
+SKILLS_TECHNICAL = CONTENT.sections["skills_technical"]
+SKILLS_TOOLS = CONTENT.sections["skills_tools"]
+CERTIFICATES = CONTENT.sections["certificates"]
+ADDITIONAL_ACHIEVEMENTS = CONTENT.sections["additional_achievements"]
+
 # ---------- Models ----------
+FEEDBACK_MAX_BYTES = int(os.environ.get("FEEDBACK_MAX_BYTES", "16384"))
+FEEDBACK_MESSAGE_MAX = int(os.environ.get("FEEDBACK_MESSAGE_MAX", "5000"))
+FEEDBACK_NAME_MAX = 200
+FEEDBACK_BODY_TIMEOUT = float(os.environ.get("FEEDBACK_BODY_TIMEOUT", "10"))
+
 class FeedbackModel(BaseModel):
-    name: Optional[str]
-    email: Optional[EmailStr]
-    message: str
+    name: Optional[str] = Field(None, max_length=FEEDBACK_NAME_MAX)
+    email: Optional[EmailStr] = None
+    message: str = Field(max_length=FEEDBACK_MESSAGE_MAX)
 
-# ---------- SMTP helper ----------
-def send_email_via_smtp(subject: str, body: str, reply_to: Optional[str] = None) -> bool:
+    @field_validator("name")
+    @classmethod
+    def single_line_name(cls, v: Optional[str]) -> Optional[str]:
+        # the name ends up in an email Subject header, so no line breaks or other control whitespace
+        return " ".join(v.split()) if v is not None else None
+
+# ---------- Spam scoring ----------
+SPAM_MODEL_FILE = os.environ.get("SPAM_MODEL_FILE", "spam_model.npz")
+SPAM_THRESHOLD = float(os.environ.get("SPAM_THRESHOLD", "0.9"))
+SPAM_MAX_BYTES = 4096  # per message; enough to classify, bounds the work per entry
+
+def spam_text(entry: dict) -> str:
+    return f"{entry.get('name') or ''}\n{entry.get('email') or ''}\n{entry.get('message') or ''}"
+
+def spam_features(texts: List[str], bits: int, ngrams: tuple):
     """
-    Send an email using configured SMTP. Returns True if sent, False otherwise.
-    Uses SMTP_USER as auth username if provided; otherwise does nothing.
+    Hashed character n-grams for a batch of texts, computed over one
+    concatenated byte array: returns (doc index, bucket) for every n-gram
+    that does not cross a text boundary, and 1/sqrt(n-gram count) per text.
     """
-    if not SMTP_USER or not SMTP_PASS or not SMTP_HOST or not SMTP_PORT:
-        return False
-    try:
-        msg = EmailMessage()
-        msg["Subject"] = subject
-        msg["From"] = SMTP_USER
-        msg["To"] = CONTACT_RECEIVER
-        if reply_to:
-            msg["Reply-To"] = reply_to
-        msg.set_content(body)
-        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=15)
-        server.starttls()
-        server.login(SMTP_USER, SMTP_PASS)
-        server.send_message(msg)
-        server.quit()
+    load_numpy()  # also called from train_spam_model.py, before any SpamModel is loaded
+    encoded = [t.lower().encode("utf-8", "replace")[:SPAM_MAX_BYTES] for t in texts]
+    lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint32)
+    owner = np.repeat(np.arange(len(encoded)), lengths)
+    docs, buckets = [], []
+    for n in ngrams:
+        m = len(data) - n + 1
+        if m <= 0:
+            continue
+        h = np.full(m, 2166136261 ^ n, dtype=np.uint32)
+        for k in range(n):
+            h = (h ^ data[k:k + m]) * np.uint32(16777619)  # FNV-1a, wrapping uint32
+        inside = owner[:m] == owner[n - 1:n - 1 + m]
+        docs.append(owner[:m][inside])
+        buckets.append((h[inside] * np.uint32(2654435761)) >> np.uint32(32 - bits))
+    docs = np.concatenate(docs) if docs else np.zeros(0, dtype=np.int64)
+    buckets = np.concatenate(buckets).astype(np.int64) if buckets else np.zeros(0, dtype=np.int64)
+    counts = np.bincount(docs, minlength=len(encoded))
+    return docs, buckets, 1.0 / np.sqrt(np.maximum(counts, 1))
+
+def load_numpy():
+    """numpy, imported on first use so startup does not pay for it; None if it is not installed."""
+    global np
+    if np is None and importlib.util.find_spec("numpy") is not None:
+        import numpy
+        np = numpy
+    return np
+
+class SpamModel:
+    """
+    Logistic regression over hashed character n-grams, trained offline by
+    train_spam_model.py. Loaded on first use; scoring is disabled (None) when
+    numpy or the model file is missing.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.weights = None
+        self.bias = 0.0
+        self.bits = 0
+        self.ngrams = ()
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not os.path.exists(self.path) or load_numpy() is None:
+                return
+            try:
+                with np.load(self.path) as data:
+                    self.weights = data["weights"].astype(np.float32)
+                    self.bias = float(data["bias"])
+                    self.ngrams = tuple(int(n) for n in data["ngrams"])
+                self.bits = int(self.weights.shape[0]).bit_length() - 1
+            except Exception as e:
+                print("Could not load spam model", self.path, "-", e)
+                self.weights = None
+
+    @property
+    def enabled(self) -> bool:
+        self._load()
+        return self.weights is not None
+
+    def score(self, texts: List[str]):
+        """Spam probability per text, or None when scoring is disabled."""
+        if not self.enabled:
+            return None
+        if not texts:
+            return []
+        docs, buckets, norms = spam_features(texts, self.bits, self.ngrams)
+        logits = self.bias + np.bincount(docs, weights=self.weights[buckets], minlength=len(texts)) * norms
+        return (1.0 / (1.0 + np.exp(-logits))).tolist()
+
+SPAM_MODEL = SpamModel(SPAM_MODEL_FILE)
+
+# ---------- Mail dispatcher ----------
+# Outgoing mail goes through a durable outbox (one JSON file per message) and a
+# single asyncio dispatcher task that keeps one authenticated SMTP connection open.
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "1") != "0"
+MAIL_OUTBOX_DIR = os.environ.get("MAIL_OUTBOX_DIR", "outbox")
+MAIL_IDLE_TIMEOUT = float(os.environ.get("MAIL_IDLE_TIMEOUT", "60"))
+MAIL_DIGEST_THRESHOLD = int(os.environ.get("MAIL_DIGEST_THRESHOLD", "5"))
+MAIL_DIGEST_WINDOW = float(os.environ.get("MAIL_DIGEST_WINDOW", "60"))
+MAIL_MAX_ATTEMPTS = int(os.environ.get("MAIL_MAX_ATTEMPTS", "8"))
+MAIL_BACKOFF_BASE = float(os.environ.get("MAIL_BACKOFF_BASE", "5"))
+MAIL_BACKOFF_MAX = float(os.environ.get("MAIL_BACKOFF_MAX", "900"))
+MAIL_OUTBOX_POLL = float(os.environ.get("MAIL_OUTBOX_POLL", "2"))
+MAIL_SEND_DEADLINE = float(os.environ.get("MAIL_SEND_DEADLINE", "20"))
+MAIL_BREAKER_THRESHOLD = int(os.environ.get("MAIL_BREAKER_THRESHOLD", "3"))
+MAIL_BREAKER_COOLDOWN = float(os.environ.get("MAIL_BREAKER_COOLDOWN", "300"))
+
+def smtp_configured() -> bool:
+    return bool(SMTP_HOST and SMTP_PORT and SMTP_USER)
+
+def header_value(value: str) -> str:
+    """One line of header text: CR, LF and other whitespace runs become single spaces."""
+    return " ".join(str(value).split())
+
+def build_email(subject: str, body: str, reply_to: Optional[str] = None) -> "EmailMessage":
+    # imported here so deployments without SMTP never pay for the email package
+    from email.message import EmailMessage
+    msg = EmailMessage()
+    msg["Subject"] = header_value(subject)
+    msg["From"] = SMTP_USER
+    msg["To"] = CONTACT_RECEIVER
+    if reply_to:
+        msg["Reply-To"] = header_value(reply_to)
+    msg.set_content(body)
+    return msg
+
+class SMTPError(Exception):
+    def __init__(self, message: str, code: int = 0):
+        super().__init__(message)
+        self.code = code
+
+class SMTPRejected(SMTPError):
+    """A 5xx reply to MAIL, RCPT or DATA: the server will never accept this message."""
+
+class AsyncSMTPConnection:
+    """
+    Minimal asyncio SMTP client: EHLO, optional STARTTLS, AUTH PLAIN and
+    MAIL/RCPT/DATA on one connection that can carry many messages. Never
+    blocks the event loop; callers bound each operation with a deadline.
+    """
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.extensions = set()
+
+    async def _read_reply(self) -> tuple:
+        lines = []
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                raise ConnectionError("SMTP server closed the connection")
+            lines.append(line[4:].strip().decode("utf-8", "replace"))
+            if line[3:4] != b"-":
+                return int(line[:3]), lines
+
+    async def command(self, line: str, expect: tuple = (250,)) -> list:
+        self.writer.write(line.encode("utf-8") + b"\r\n")
+        await self.writer.drain()
+        code, lines = await self._read_reply()
+        if code not in expect:
+            raise SMTPError(f"{line.split(' ')[0]} failed: {code} {' '.join(lines)}", code)
+        return lines
+
+    async def _ehlo(self):
+        lines = await self.command(f"EHLO {socket.getfqdn()}")
+        self.extensions = {l.split(" ")[0].upper() for l in lines[1:]}
+
+    async def connect(self, starttls: bool, user: Optional[str], password: Optional[str]):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        code, lines = await self._read_reply()
+        if code != 220:
+            raise SMTPError(f"greeting failed: {code} {' '.join(lines)}", code)
+        await self._ehlo()
+        if starttls:
+            import ssl
+            await self.command("STARTTLS", expect=(220,))
+            await self.writer.start_tls(ssl.create_default_context(), server_hostname=self.host)
+            await self._ehlo()
+        if user and password:
+            token = base64.b64encode(f"\0{user}\0{password}".encode("utf-8")).decode("ascii")
+            await self.command(f"AUTH PLAIN {token}", expect=(235,))
+
+    async def send(self, msg: "EmailMessage", sender: str, recipients: List[str]):
+        from email import policy
+        data = msg.as_bytes(policy=policy.SMTP)
+        body8 = " BODY=8BITMIME" if "8BITMIME" in self.extensions and not data.isascii() else ""
+        try:
+            await self.command(f"MAIL FROM:<{sender}>{body8}")
+            for rcpt in recipients:
+                await self.command(f"RCPT TO:<{rcpt}>", expect=(250, 251))
+            await self.command("DATA", expect=(354,))
+            if data.startswith(b"."):
+                data = b"." + data
+            data = data.replace(b"\r\n.", b"\r\n..")
+            if not data.endswith(b"\r\n"):
+                data += b"\r\n"
+            self.writer.write(data + b".\r\n")
+            await self.writer.drain()
+            code, lines = await self._read_reply()
+            if code != 250:
+                raise SMTPError(f"DATA rejected: {code} {' '.join(lines)}", code)
+        except SMTPError as e:
+            if 500 <= e.code < 600:
+                raise SMTPRejected(str(e), e.code) from e
+            raise
+
+    async def close(self, polite: bool = True):
+        writer, self.writer = self.writer, None
+        if writer is None:
+            return
+        try:
+            if polite:
+                writer.write(b"QUIT\r\n")
+                await asyncio.wait_for(writer.drain(), timeout=2)
+            writer.close()
+        except Exception:
+            writer.transport.abort()
+
+class CircuitBreaker:
+    """
+    Closed until `threshold` consecutive failures, then open for `cooldown`
+    seconds; after that one trial is allowed (half-open), which either closes
+    the breaker again or re-opens it.
+    """
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "open" if time.monotonic() - self.opened_at < self.cooldown else "half-open"
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            self.opened_at = time.monotonic()
+
+class MailDispatcher:
+    """
+    Delivers outbox messages over a persistent SMTP connection.
+    - The connection is reused and dropped after MAIL_IDLE_TIMEOUT seconds idle.
+    - Past MAIL_DIGEST_THRESHOLD sends per MAIL_DIGEST_WINDOW, due messages are
+      coalesced into one digest email.
+    - Failures are retried with exponential backoff; messages survive restarts
+      because they stay on disk until delivered.
+    - Each delivery has an overall MAIL_SEND_DEADLINE, and a circuit breaker
+      pauses all sending for MAIL_BREAKER_COOLDOWN after repeated failures
+      (connection errors, timeouts, 4xx replies). A 5xx reply to one message
+      is permanent: the message is set aside as .dead without touching the
+      breaker, and a rejected digest is resent as single messages.
+    - With several worker processes only the one holding the outbox lock
+      sends; the others just write into the outbox, which the leader rescans
+      every MAIL_OUTBOX_POLL seconds. A worker takes over if the leader exits.
+    """
+    def __init__(self, outbox_dir: str):
+        self.outbox_dir = outbox_dir
+        self.pending = {}
+        self.sent_times = collections.deque()
+        self._lock = threading.Lock()
+        self.breaker = CircuitBreaker(MAIL_BREAKER_THRESHOLD, MAIL_BREAKER_COOLDOWN)
+        self._smtp: Optional[AsyncSMTPConnection] = None
+        self._last_used = 0.0
+        self._wake: Optional[asyncio.Event] = None
+        self._loop = None
+        self._task: Optional[asyncio.Task] = None
+        self.leader = True
+        self._leader_fd = None
+        self._stopping = False
+
+    def _acquire_leader(self) -> bool:
+        if fcntl is None:
+            return True
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        fd = os.open(os.path.join(self.outbox_dir, ".leader.lock"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._leader_fd = fd
+        return True
+
+    def _load_outbox(self):
+        """Pick up messages on disk that are not pending yet (after a restart or from other workers)."""
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        for name in sorted(os.listdir(self.outbox_dir)):
+            if not name.endswith(".json") or name in self.pending:
+                continue
+            try:
+                with open(os.path.join(self.outbox_dir, name), "r", encoding="utf-8") as f:
+                    rec = json.load(f)
+            except Exception:
+                continue
+            with self._lock:
+                self.pending[name] = rec
+
+    def _write(self, name: str, rec: dict):
+        path = os.path.join(self.outbox_dir, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(rec, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+
+    def enqueue(self, subject: str, body: str, reply_to: Optional[str] = None) -> bool:
+        """Durably queue a message. Thread-safe; returns False when SMTP is not configured."""
+        if not smtp_configured():
+            return False
+        os.makedirs(self.outbox_dir, exist_ok=True)
+        name = f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.json"
+        rec = {"subject": subject, "body": body, "reply_to": reply_to, "attempts": 0, "next_attempt": 0.0}
+        self._write(name, rec)
+        if not self.leader:
+            return True
+        with self._lock:
+            self.pending[name] = rec
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
         return True
+
+    def _due(self):
+        now = time.time()
+        with self._lock:
+            due = [(n, r) for n, r in sorted(self.pending.items()) if r["next_attempt"] <= now]
+            waits = [r["next_attempt"] - now for r in self.pending.values() if r["next_attempt"] > now]
+        return due, (min(waits) if waits else None)
+
+    def _over_rate(self) -> bool:
+        cutoff = time.monotonic() - MAIL_DIGEST_WINDOW
+        while self.sent_times and self.sent_times[0] < cutoff:
+            self.sent_times.popleft()
+        return len(self.sent_times) >= MAIL_DIGEST_THRESHOLD
+
+    # --- SMTP connection ---
+    async def _connect(self) -> AsyncSMTPConnection:
+        if self._smtp is not None and time.monotonic() - self._last_used < MAIL_IDLE_TIMEOUT:
+            return self._smtp
+        await self._close()
+        smtp = AsyncSMTPConnection(SMTP_HOST, SMTP_PORT)
+        try:
+            await smtp.connect(SMTP_STARTTLS, SMTP_USER, SMTP_PASS)
+        except BaseException:
+            await smtp.close(polite=False)
+            raise
+        self._smtp = smtp
+        return smtp
+
+    async def _close(self, polite: bool = True):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None:
+            await smtp.close(polite)
+
+    async def _deliver(self, msg: "EmailMessage"):
+        for attempt in (0, 1):
+            reused = self._smtp is not None
+            smtp = await self._connect()
+            try:
+                await smtp.send(msg, SMTP_USER, [CONTACT_RECEIVER])
+                self._last_used = time.monotonic()
+                return
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # the server dropped a reused idle connection; reconnect once
+                await self._close(polite=False)
+                if attempt or not reused:
+                    raise
+            except BaseException:
+                await self._close(polite=False)
+                raise
+
+    async def _close_if_idle(self):
+        if self._smtp is not None and time.monotonic() - self._last_used >= MAIL_IDLE_TIMEOUT:
+            await self._close()
+
+    def status(self) -> dict:
+        return {
+            "configured": smtp_configured(),
+            "breaker": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "retry_in": round(self.breaker.retry_in(), 1),
+            "outbox": len(self.pending),
+            "connected": self._smtp is not None,
+            "leader": self.leader,
+        }
+
+    # --- async side ---
+    async def _dispatch(self, due):
+        if len(due) > 1 and self._over_rate() and not any(r.get("single") for _, r in due):
+            batch = due
+        else:
+            batch = due[:1]
+        try:
+            if len(batch) > 1:
+                parts = [f"Subject: {r['subject']}\n\n{r['body']}" for _, r in batch]
+                msg = build_email(f"[Portfolio] {len(batch)} new feedback messages",
+                                  ("\n\n" + "-" * 40 + "\n\n").join(parts))
+            else:
+                r = batch[0][1]
+                msg = build_email(r["subject"], r["body"], r.get("reply_to"))
+        except Exception as e:
+            # a record that cannot be turned into an email never will be; set it aside
+            print("Cannot build email from outbox message:", repr(e))
+            FEEDBACK_EVENTS["failed", "invalid_mail"] += len(batch)
+            for name, _ in batch:
+                self._dead_letter(name)
+            return
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._deliver(msg), timeout=MAIL_SEND_DEADLINE)
+        except SMTPRejected as e:
+            STAGE_LATENCY["smtp"].observe(time.perf_counter() - start)
+            print("SMTP server rejected the message:", e)
+            if len(batch) > 1:
+                # one of them is the problem; send each on its own so only that one is set aside
+                for name, rec in batch:
+                    rec["single"] = True
+                    try:
+                        self._write(name, rec)
+                    except OSError:
+                        pass
+                return
+            FEEDBACK_EVENTS["failed", "rejected"] += 1
+            self._dead_letter(batch[0][0])
+            return
+        except Exception as e:
+            STAGE_LATENCY["smtp"].observe(time.perf_counter() - start)
+            FEEDBACK_EVENTS["failed", "smtp"] += len(batch)
+            self.breaker.record_failure()
+            print("SMTP send failed:", repr(e))
+            for name, rec in batch:
+                self._retry_later(name, rec)
+            # the server is likely unavailable for the rest of the due set too
+            resume_at = min((r["next_attempt"] for _, r in batch), default=0.0)
+            for _, rec in due[len(batch):]:
+                rec["next_attempt"] = max(rec["next_attempt"], resume_at)
+            return
+        STAGE_LATENCY["smtp"].observe(time.perf_counter() - start)
+        self.breaker.record_success()
+        FEEDBACK_EVENTS["emailed", "digest" if len(batch) > 1 else "single"] += len(batch)
+        self.sent_times.append(time.monotonic())
+        for name, _ in batch:
+            with self._lock:
+                self.pending.pop(name, None)
+            try:
+                os.remove(os.path.join(self.outbox_dir, name))
+            except OSError:
+                pass
+
+    def _dead_letter(self, name: str):
+        """Drop a message from the queue, keeping it on disk as <name>.dead for inspection."""
+        with self._lock:
+            self.pending.pop(name, None)
+        path = os.path.join(self.outbox_dir, name)
+        try:
+            os.replace(path, path[:-len(".json")] + ".dead")
+        except OSError:
+            pass
+
+    def _retry_later(self, name: str, rec: dict):
+        rec["attempts"] += 1
+        if rec["attempts"] >= MAIL_MAX_ATTEMPTS:
+            print("Giving up on outbox message", name, "after", rec["attempts"], "attempts")
+            self._dead_letter(name)
+            return
+        delay = min(MAIL_BACKOFF_MAX, MAIL_BACKOFF_BASE * 2 ** (rec["attempts"] - 1))
+        rec["next_attempt"] = time.time() + delay * random.uniform(0.8, 1.2)
+        try:
+            self._write(name, rec)
+        except OSError:
+            pass
+
+    async def run(self):
+        # checked as well as cancelled: on 3.11 wait_for() swallows a cancel
+        # that lands just as the wake event fires (e.g. the final queue drain)
+        while not self._stopping:
+            if not self.leader:
+                # another worker drains the outbox; take over if it goes away
+                await asyncio.sleep(MAIL_OUTBOX_POLL)
+                if smtp_configured() and await asyncio.to_thread(self._acquire_leader):
+                    self.leader = True
+                    await asyncio.to_thread(self._load_outbox)
+                continue
+            if self.breaker.state == "open":
+                # leave everything in the outbox until the cool-down is over
+                await asyncio.sleep(self.breaker.retry_in())
+                continue
+            due, wait = self._due()
+            if due:
+                try:
+                    await self._dispatch(due)
+                except Exception as e:
+                    # never let one bad record end the dispatcher; the outbox is rescanned later
+                    print("Mail dispatch failed:", repr(e))
+                    await asyncio.sleep(MAIL_OUTBOX_POLL)
+                continue
+            self._wake.clear()
+            timeout = min(MAIL_IDLE_TIMEOUT, MAIL_OUTBOX_POLL) if wait is None else min(wait, MAIL_IDLE_TIMEOUT, MAIL_OUTBOX_POLL)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                await self._close_if_idle()
+                if smtp_configured():
+                    await asyncio.to_thread(self._load_outbox)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._stopping = False
+        if smtp_configured():
+            self.leader = await asyncio.to_thread(self._acquire_leader)
+            if self.leader:
+                await asyncio.to_thread(self._load_outbox)
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        self._stopping = True
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._loop = None
+        await self._close()
+        if self._leader_fd is not None:
+            os.close(self._leader_fd)
+            self._leader_fd = None
+
+MAILER = MailDispatcher(MAIL_OUTBOX_DIR)
+
+# ---------- Background feedback worker ----------
+FEEDBACK_QUEUE_MAX = int(os.environ.get("FEEDBACK_QUEUE_MAX", "256"))
+FEEDBACK_DRAIN_TIMEOUT = float(os.environ.get("FEEDBACK_DRAIN_TIMEOUT", "10"))
+FEEDBACK_QUEUE: Optional[asyncio.Queue] = None
+_FEEDBACK_WORKER: Optional[asyncio.Task] = None
+
+FEEDBACK_BATCH_MAX = int(os.environ.get("FEEDBACK_BATCH_MAX", "64"))
+
+def process_feedback(entries: List[dict]):
+    """
+    Blocking part of a batch of submissions: score them for spam in one go,
+    append to the log and queue the emails. Held (likely spam) entries are
+    stored with "held": true and skip the email. If scoring fails the batch
+    is stored and emailed unscored rather than lost. Runs in a thread so the
+    event loop keeps serving pages meanwhile.
+    """
+    start = time.perf_counter()
+    try:
+        scores = SPAM_MODEL.score([spam_text(e) for e in entries])
     except Exception as e:
-        print("SMTP send failed:", e)
-        return False
+        print("Spam scoring failed, storing", len(entries), "submissions unscored:", e)
+        FEEDBACK_EVENTS["failed", "spam"] += len(entries)
+        scores = None
+    if scores is not None:
+        STAGE_LATENCY["spam"].observe(time.perf_counter() - start)
+        for entry, score in zip(entries, scores):
+            if score >= SPAM_THRESHOLD:
+                entry["held"] = True
+                FEEDBACK_EVENTS["held", "spam"] += 1
+    for entry in entries:
+        start = time.perf_counter()
+        save_submission(entry)
+        STAGE_LATENCY["storage"].observe(time.perf_counter() - start)
+        if entry.get("held"):
+            continue
+        subject = f"[Portfolio] New feedback from {entry['name']}"
+        body = f"Name: {entry['name']}\nEmail: {entry['email']}\nReceived: {entry['_received_at']}\n\nMessage:\n{entry['message']}"
+        MAILER.enqueue(subject=subject, body=body, reply_to=entry['email'] or None)
+
+async def feedback_worker(queue: asyncio.Queue):
+    while True:
+        # whatever queued up while the last batch was processed goes in the next one
+        batch = [await queue.get()]
+        while len(batch) < FEEDBACK_BATCH_MAX and not queue.empty():
+            batch.append(queue.get_nowait())
+        try:
+            await asyncio.to_thread(process_feedback, batch)
+            await sync_feedbacks()
+        except Exception as e:
+            print("Feedback processing failed:", e)
+        finally:
+            for _ in batch:
+                queue.task_done()
+
+async def start_feedback_worker():
+    global FEEDBACK_QUEUE, _FEEDBACK_WORKER
+    FEEDBACK_QUEUE = asyncio.Queue(maxsize=FEEDBACK_QUEUE_MAX)
+    _FEEDBACK_WORKER = asyncio.create_task(feedback_worker(FEEDBACK_QUEUE))
+
+async def stop_feedback_worker():
+    """Drain queued submissions (bounded by FEEDBACK_DRAIN_TIMEOUT), then stop the worker."""
+    global FEEDBACK_QUEUE, _FEEDBACK_WORKER
+    queue, worker = FEEDBACK_QUEUE, _FEEDBACK_WORKER
+    FEEDBACK_QUEUE = None
+    if queue is not None:
+        try:
+            await asyncio.wait_for(queue.join(), timeout=FEEDBACK_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            print("Feedback drain timed out with", queue.qsize(), "submissions still queued")
+    if worker is not None:
+        worker.cancel()
+        try:
+            await worker
+        except asyncio.CancelledError:
+            pass
+    _FEEDBACK_WORKER = None
+    FEEDBACK_STORE.sync()
 
 # ---------- Resume HTML (light theme) ----------
-RESUME_HTML = """<!doctype html>
+def build_resume_html(skills: List[str], certificates: List[str]) -> str:
+    return """<!doctype html>
 <html lang="en"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
 <title>Resume - Divytosh Upadhyay</title>
 <style>
@@ -182,7 +1493,7 @@ h1{margin:0} .muted{color:#4b5563}
 </div>
 
 <div class="section"><strong>Skills</strong>
-<div>""" + ", ".join(SKILLS_TECHNICAL + SKILLS_TOOLS) + """</div>
+<div>""" + ", ".join(skills) + """</div>
 </div>
 
 <div class="section"><strong>Selected Projects</strong>
@@ -195,7 +1506,7 @@ h1{margin:0} .muted{color:#4b5563}
 
 <div class="section"><strong>Certifications</strong>
 <ul>
-""" + "".join(f"<li>{c}</li>" for c in CERTIFICATES) + """
+""" + "".join(f"<li>{c}</li>" for c in certificates) + """
 </ul>
 </div>
 
@@ -207,11 +1518,45 @@ h1{margin:0} .muted{color:#4b5563}
 </ul>
 </div>
 
-<div class="section muted"><small>Generated: """ + datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC") + """</small></div>
-
 </div></body></html>
 """
 
+RESUME_HTML = build_resume_html(SKILLS_TECHNICAL + SKILLS_TOOLS, CERTIFICATES)
+
+# Optional PDF rendition of the resume, rendered once with WeasyPrint (if installed)
+# and cached on disk under a content hash of RESUME_HTML. The HTML carries no
+# timestamp, so the hash (and the /resume ETag) only moves when the content does.
+RESUME_PDF_DIR = os.environ.get("RESUME_PDF_DIR", ".cache")
+
+def resume_hash(html: str) -> str:
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()[:16]
+
+RESUME_HASH = resume_hash(RESUME_HTML)
+
+def render_resume_pdf() -> Optional[bytes]:
+    path = os.path.join(RESUME_PDF_DIR, f"resume-{RESUME_HASH}.pdf")
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        return None
+    pdf = HTML(string=RESUME_HTML).write_pdf()
+    try:
+        os.makedirs(RESUME_PDF_DIR, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(pdf)
+        os.replace(path + ".tmp", path)
+        for name in os.listdir(RESUME_PDF_DIR):
+            if name.startswith("resume-") and name.endswith(".pdf") and name != os.path.basename(path):
+                os.remove(os.path.join(RESUME_PDF_DIR, name))  # renditions of earlier content
+    except OSError as e:
+        print("Could not cache resume PDF:", e)
+    return pdf
+
 # ---------- Main HTML template ----------
 MAIN_HTML_TEMPLATE = """<!doctype html>
 <html lang="en"><head><meta charset="utf-8"><meta name="viewport" content="width=device-width,initial-scale=1">
@@ -262,7 +1607,7 @@ html,body{height:100%;margin:0;background:var(--bg);color:#e6eef8;font-family:In
     </div>
     <div class="cta">
       <a href="#projects"><button class="btn">View Projects ▶</button></a>
-      <a id="downloadResumeBtn"><button class="btn ghost">Download Resume ⬇</button></a>
+      <a id="downloadResumeBtn" href="/resume" download="Divytosh_Resume.html"><button class="btn ghost">Download Resume ⬇</button></a>
     </div>
   </header>
 
@@ -296,10 +1641,10 @@ html,body{height:100%;margin:0;background:var(--bg);color:#e6eef8;font-family:In
         <h2>Skills</h2>
         <div class="section-card">
           <strong>Technical</strong>
-          <div style="margin-top:8px">{skills_technical_html}</div>
+          <div style="margin-top:8px">{skills_technical_html|safe}</div>
           <hr style="opacity:0.06;margin:12px 0">
           <strong>Tools</strong>
-          <div style="margin-top:8px">{skills_tools_html}</div>
+          <div style="margin-top:8px">{skills_tools_html|safe}</div>
         </div>
 
         <div style="display:flex;gap:12px;margin-top:12px">
@@ -348,13 +1693,13 @@ html,body{height:100%;margin:0;background:var(--bg);color:#e6eef8;font-family:In
 
       <section id="projects" style="margin-top:14px">
         <h2>Projects</h2>
-        {projects_html}
+        {projects_html|safe}
       </section>
 
       <section id="certifications" style="margin-top:14px">
         <h2>Certifications</h2>
         <div class="section-card">
-          <ul class="muted" style="margin:0;padding-left:18px">{certificates_html}</ul>
+          <ul class="muted" style="margin:0;padding-left:18px">{certificates_html|safe}</ul>
         </div>
       </section>
 
@@ -403,7 +1748,7 @@ html,body{height:100%;margin:0;background:var(--bg);color:#e6eef8;font-family:In
           </div>
         </div>
 
-        <div id="feedbackList" style="margin-top:12px">{initial_feedbacks_html}</div>
+        <div id="feedbackList" style="margin-top:12px">{initial_feedbacks_html|safe}</div>
       </section>
 
     </main>
@@ -431,19 +1776,11 @@ html,body{height:100%;margin:0;background:var(--bg);color:#e6eef8;font-family:In
   </div>
 </div>
 
+<script type="application/json" id="page-data">{"projects": {projects_json|safe}}</script>
 <script>
-const PROJECTS = {projects_json};
-const FEEDBACKS = {feedbacks_json};
-
-// Download resume
-document.getElementById('downloadResumeBtn').addEventListener('click', function(){
-  const content = `{resume_html}`;
-  const blob = new Blob([content], {{type: 'text/html'}});
-  const url = URL.createObjectURL(blob);
-  const a = document.createElement('a');
-  a.href = url; a.download = 'Divytosh_Resume.html';
-  document.body.appendChild(a); a.click(); a.remove(); URL.revokeObjectURL(url);
-});
+// Data comes from the JSON block above, so this script is the same file for every render.
+const PAGE_DATA = JSON.parse(document.getElementById('page-data').textContent);
+const PROJECTS = PAGE_DATA.projects;
 
 // Feedback handling
 const fbSubmit = document.getElementById('fb_submit');
@@ -476,11 +1813,10 @@ fbSubmit.addEventListener('click', async () => {
     if(res.ok){
       fbStatus.textContent = data.detail || 'Thanks — your feedback was received.';
       fbStatus.style.color = '#aee1c6';
-      const node = document.createElement('div');
-      node.className = 'section-card';
-      node.style.marginTop = '8px';
-      node.innerHTML = `<div style="display:flex;justify-content:space-between;align-items:center"><div><strong>${payload.name || 'Anonymous'}</strong> <span class="muted" style="margin-left:8px">${payload.email || ''}</span></div><div class="muted" style="font-size:12px">${data.ts}</div></div><div style="margin-top:8px">${payload.message}</div>`;
-      feedbackList.insertBefore(node, feedbackList.firstChild);
+      const empty = document.getElementById('feedbackEmpty');
+      if(empty) empty.remove();
+      // server-rendered and escaped, same markup as the embedded cards
+      if(data.html) feedbackList.insertAdjacentHTML('afterbegin', data.html);
       document.getElementById('fb_name').value='';
       document.getElementById('fb_email').value='';
       document.getElementById('fb_message').value='';
@@ -520,6 +1856,12 @@ document.querySelectorAll('a[href^="#"]').forEach(a => {
 """
 
 # ---------- Helpers ----------
+def safe_url(url: str) -> str:
+    """An http(s) URL escaped for an attribute; anything else becomes '#'."""
+    if not isinstance(url, str) or not re.match(r"https?://", url.strip(), re.I):
+        return "#"
+    return escape_html(url.strip())
+
 def escape_html(s: str) -> str:
     return (
         s.replace("&", "&amp;")
@@ -529,18 +1871,162 @@ def escape_html(s: str) -> str:
          .replace("'", "&#39;")
     )
 
-def build_projects_html(projects):
+class Template:
+    """
+    A template compiled once into literal byte chunks and slots. `{name}` is
+    escaped with escape_html; `{name|safe}` inserts prebuilt markup/JSON as is,
+    and bytes values are always inserted as is. Rendering is one b"".join.
+    """
+    SLOT_RE = re.compile(r"\{([a-z_][a-z0-9_]*)(\|safe)?\}")
+
+    def __init__(self, source: str = ""):
+        self.chunks = []
+        self.slots = []
+        pos = 0
+        for m in self.SLOT_RE.finditer(source):
+            self.chunks.append(source[pos:m.start()].encode("utf-8"))
+            self.slots.append((m.group(1), bool(m.group(2))))
+            pos = m.end()
+        self.chunks.append(source[pos:].encode("utf-8"))
+
+    @staticmethod
+    def _encode(value, safe: bool) -> bytes:
+        if isinstance(value, bytes):
+            return value
+        value = str(value)
+        return (value if safe else escape_html(value)).encode("utf-8")
+
+    def partial(self, values: dict) -> "Template":
+        """Fill the slots named in `values` now; the rest stay open."""
+        out = Template()
+        out.chunks = [self.chunks[0]]
+        for (name, safe), chunk in zip(self.slots, self.chunks[1:]):
+            if name in values:
+                out.chunks[-1] += self._encode(values[name], safe) + chunk
+            else:
+                out.slots.append((name, safe))
+                out.chunks.append(chunk)
+        return out
+
+    def render(self, values: dict) -> bytes:
+        parts = [self.chunks[0]]
+        for (name, safe), chunk in zip(self.slots, self.chunks[1:]):
+            parts.append(self._encode(values[name], safe))
+            parts.append(chunk)
+        return b"".join(parts)
+
+def accepted_encodings(header: str) -> dict:
+    """Parse Accept-Encoding into {coding: q}."""
+    out = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        out[coding] = q
+    return out
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+class StaticBody:
+    """
+    A response body compressed once (gzip, plus brotli when the module is
+    installed) with a strong ETag per encoding. Compression happens on first
+    use rather than at construction, keeping it off the startup path.
+    respond() picks the variant from Accept-Encoding and answers
+    If-None-Match with a bodyless 304.
+    """
+    def __init__(self, body: bytes, media_type: str, cache_control: str = "no-cache",
+                 headers: Optional[dict] = None, brotli_quality: int = 11, variants: Optional[dict] = None):
+        self.body = body
+        self.media_type = media_type
+        self.brotli_quality = brotli_quality
+        self.headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding", **(headers or {})}
+        self._variants = variants
+
+    @property
+    def variants(self) -> dict:
+        if self._variants is None:
+            body = self.body
+            digest = hashlib.sha256(body).hexdigest()[:32]
+            variants = {"identity": (body, f'"{digest}"')}
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                variants["gzip"] = (gz, f'"{digest}-gz"')
+            if brotli is not None:
+                br = brotli.compress(body, quality=self.brotli_quality)
+                if len(br) < len(body):
+                    variants["br"] = (br, f'"{digest}-br"')
+            self._variants = variants
+        return self._variants
+
+    def select(self, accept_encoding: str) -> str:
+        accepted = accepted_encodings(accept_encoding)
+        variants = self.variants
+        for coding in ("br", "gzip"):
+            if coding in variants and accepted.get(coding, accepted.get("*", 0.0)) > 0:
+                return coding
+        return "identity"
+
+    def respond(self, request: Request) -> Response:
+        coding = self.select(request.headers.get("accept-encoding", ""))
+        body, etag = self.variants[coding]
+        headers = dict(self.headers, ETag=etag)
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type=self.media_type, headers=headers)
+
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ASSET_TAG_RE = re.compile(r"<(style|script)>\n?(.*?)</\1>", re.S)
+
+def extract_assets(source: str):
+    """
+    Move the bare <style> and <script> blocks of a page into files named by
+    their content hash, served as /static/app.<hash>.css|js. A changed file
+    gets a new name, so browsers may keep them forever. Returns the page
+    source with link/script tags in their place and {name: StaticBody}.
+    """
+    assets = {}
+    def move(m):
+        kind = "css" if m.group(1) == "style" else "js"
+        body = m.group(2).encode("utf-8")
+        name = f"app.{hashlib.sha256(body).hexdigest()[:12]}.{kind}"
+        media_type = "text/css; charset=utf-8" if kind == "css" else "text/javascript; charset=utf-8"
+        assets[name] = StaticBody(body, media_type, cache_control=ASSET_CACHE_CONTROL)
+        if kind == "css":
+            return f'<link rel="stylesheet" href="/static/{name}">'
+        return f'<script src="/static/{name}" defer></script>'
+    return ASSET_TAG_RE.sub(move, source), assets
+
+def build_projects_html(projects, related=None):
     parts = []
     for p in projects:
+        links = related.links_html(str(p.get("id", ""))) if related is not None else ""
         part = (
-            "<div class='project-card' style='margin-top:10px'>"
+            f"<div class='project-card' id='project-{escape_html(p.get('id', ''))}' style='margin-top:10px'>"
             "<div style='max-width:75%'>"
             f"<div style='font-weight:800'>{escape_html(p['title'])}</div>"
             f"<div class='muted' style='margin-top:6px'>{escape_html(p['summary'])}</div>"
             f"<div style='margin-top:8px'><span class='muted'>Tags:</span> {' · '.join(escape_html(t) for t in p.get('tags',[]))}</div>"
+            f"{links}"
             "</div>"
             "<div style='display:flex;flex-direction:column;gap:8px;align-items:flex-end'>"
-            f"<a class='btn gitlight' href='{p.get('github','#')}' target='_blank'>View on GitHub</a>"
+            f"<a class='btn gitlight' href='{safe_url(p.get('github', '#'))}' target='_blank'>View on GitHub</a>"
             "</div></div>"
         )
         parts.append(part)
@@ -552,111 +2038,1167 @@ def build_skills_html(skill_list):
 def build_certificates_html(cert_list):
     return "\n".join(f"<li>{escape_html(c)}</li>" for c in cert_list)
 
+def render_feedback_card(fb: FeedbackRecord) -> str:
+    name = escape_html(fb.name or "Anonymous")
+    email = escape_html(fb.email)
+    ts = escape_html(fb.received_at)
+    msg = escape_html(fb.message).replace("\n", "<br>")
+    return (
+        "<div class='section-card' style='margin-top:8px'>"
+        f"<div style='display:flex;justify-content:space-between;align-items:center'><div><strong>{name}</strong> <span class='muted' style='margin-left:8px'>{email}</span></div><div class='muted' style='font-size:12px'>{ts}</div></div>"
+        f"<div style='margin-top:8px'>{msg}</div>"
+        "</div>"
+    )
+
+class FeedbackCards:
+    """
+    LRU of rendered feedback cards keyed by receive time and message, so the
+    card returned to the submitter is the same string later embedded in the
+    page, and a page rebuild only renders the entries that are new.
+    """
+    def __init__(self, cache_size: int):
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+
+    def card(self, fb: FeedbackRecord) -> str:
+        key = (fb.received, fb.name, fb.message)
+        html = self._cache.get(key)
+        if html is not None:
+            self._cache.move_to_end(key)
+            return html
+        html = self._cache[key] = render_feedback_card(fb)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return html
+
+FEEDBACK_CARDS = FeedbackCards(FEEDBACK_CARD_CACHE_SIZE)
+
 def build_feedbacks_html(feedbacks):
     if not feedbacks:
-        return "<div class='muted'>No feedback yet.</div>"
-    items = []
-    for fb in reversed(feedbacks[-20:]):
-        name = escape_html(fb.get("name") or "Anonymous")
-        email = escape_html(fb.get("email") or "")
-        ts = escape_html(fb.get("_received_at") or fb.get("ts") or "")
-        msg = escape_html(fb.get("message") or "").replace("\n", "<br>")
-        item = (
-            "<div class='section-card' style='margin-top:8px'>"
-            f"<div style='display:flex;justify-content:space-between;align-items:center'><div><strong>{name}</strong> <span class='muted' style='margin-left:8px'>{email}</span></div><div class='muted' style='font-size:12px'>{ts}</div></div>"
-            f"<div style='margin-top:8px'>{msg}</div>"
-            "</div>"
-        )
-        items.append(item)
-    return "\n".join(items)
+        return "<div class='muted' id='feedbackEmpty'>No feedback yet.</div>"
+    return "\n".join(FEEDBACK_CARDS.card(fb) for fb in reversed(feedbacks[-FEEDBACK_EMBED_RECENT:]))
+
+# ---------- Shared state across workers ----------
+SHARED_PAGE_FILE = os.environ.get("SHARED_PAGE_FILE", os.path.join(".cache", "main_page.shm"))
+SHARED_PAGE_CAPACITY = int(os.environ.get("SHARED_PAGE_CAPACITY", str(8 * 1024 * 1024)))
+
+def boot_token() -> str:
+    """
+    Identifies this start of the server: the process that owns the workers (the
+    uvicorn parent with WEB_CONCURRENCY > 1, else this process) by pid and start
+    time, so a segment file left over from an earlier run is never trusted.
+    """
+    pid = os.getppid() if WEB_CONCURRENCY > 1 else os.getpid()
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            started = f.read().rsplit(b")", 1)[1].split()[19].decode()
+    except (OSError, IndexError):
+        started = str(int(time.time())) if pid == os.getpid() else ""
+    return f"{pid}-{started}"
+
+class SharedSegment:
+    """
+    One value (a JSON header plus named byte blobs) published in an mmap'd
+    file that every worker process maps. Layout: generation (u64), payload
+    length (u64), payload. Writers serialize on flock and keep the generation
+    odd while copying (a seqlock), so readers never lock: they retry when the
+    generation is odd or moved under them. A reader that already decoded the
+    current generation gets its copy back after one 16-byte read.
+    """
+    HEADER = struct.Struct("<QQ")
+
+    def __init__(self, path: str, capacity: int):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < capacity:
+            os.ftruncate(self.fd, capacity)
+        self.mm = mmap.mmap(self.fd, os.fstat(self.fd).st_size)
+        self.capacity = len(self.mm) - self.HEADER.size
+        self._generation = None
+        self._value = None
+
+    @contextmanager
+    def locked(self):
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def read(self):
+        """Return (meta, blobs) of the published value, or None."""
+        for _ in range(1000):
+            generation, length = self.HEADER.unpack_from(self.mm, 0)
+            if generation == self._generation:
+                return self._value
+            if generation == 0:
+                return None
+            if generation & 1:
+                time.sleep(0)
+                continue
+            if length > self.capacity:
+                return None  # published by a worker that mapped a bigger file
+            payload = self.mm[self.HEADER.size:self.HEADER.size + length]
+            if self.HEADER.unpack_from(self.mm, 0)[0] != generation:
+                continue
+            header_len = int.from_bytes(payload[:4], "little")
+            header = json.loads(payload[4:4 + header_len])
+            blobs, pos = {}, 4 + header_len
+            for name, size in header["blobs"]:
+                blobs[name] = payload[pos:pos + size]
+                pos += size
+            self._generation, self._value = generation, (header["meta"], blobs)
+            return self._value
+        return None
+
+    def publish(self, meta: dict, blobs: dict) -> bool:
+        """Replace the value; call under locked(). False if it does not fit."""
+        header = json.dumps({"meta": meta, "blobs": [[name, len(b)] for name, b in blobs.items()]}).encode("utf-8")
+        payload = b"".join([len(header).to_bytes(4, "little"), header, *blobs.values()])
+        if len(payload) > self.capacity:
+            return False
+        generation = self.HEADER.unpack_from(self.mm, 0)[0]
+        generation += generation & 1  # a writer that died mid-copy left it odd
+        self.HEADER.pack_into(self.mm, 0, generation + 1, 0)
+        self.mm[self.HEADER.size:self.HEADER.size + len(payload)] = payload
+        self.HEADER.pack_into(self.mm, 0, generation + 2, len(payload))
+        return True
+
+def open_shared_segment(path: str, capacity: int) -> Optional[SharedSegment]:
+    if not path:
+        return None
+    try:
+        return SharedSegment(path, capacity)
+    except OSError as e:
+        print("Shared page disabled:", e)
+        return None
+
+SHARED_PAGE = open_shared_segment(SHARED_PAGE_FILE, SHARED_PAGE_CAPACITY)
+BOOT_TOKEN = boot_token()
+
+class MainPage:
+    """
+    The main page as a compiled Template whose static slots are already
+    filled in. The remaining (feedback) slots are rebuilt only when `version`
+    moves past the version of the cached body, so index serves one ready
+    bytes object.
+
+    With a shared segment, the rendered and compressed page is published for
+    the other worker processes: a worker whose version moved first adopts the
+    published page only if it comes from the same boot, has the same static
+    part and settings (fingerprint) and exactly the same `state` (store
+    position and feedback count), and renders otherwise.
+    """
+    def __init__(self, template: Template, builders: dict, state=None, shared: Optional[SharedSegment] = None):
+        self.template = template
+        self.builders = builders
+        self.state = state
+        self.shared = shared if state is not None else None
+        # the builders' output also depends on FEEDBACK_EMBED_RECENT, which may differ between deploys
+        self.fingerprint = hashlib.sha256(b"\0".join(template.chunks) + repr(template.slots).encode()
+                                          + f"|{FEEDBACK_EMBED_RECENT}".encode()).hexdigest()[:32]
+        self.boot = BOOT_TOKEN
+        self.version = 0
+        self._built_version = -1
+        self._body = b""
+        self._static = None
+
+    def invalidate(self):
+        self.version += 1
+
+    def _render(self):
+        self._body = self.template.render({name: build() for name, build in self.builders.items()})
+        self._static = None
+
+    def body(self) -> bytes:
+        if self._built_version != self.version:
+            version = self.version
+            self._render()
+            self._built_version = version
+        return self._body
+
+    def cached_size(self) -> int:
+        """Length of the body last built or adopted (0 before the first request); never renders."""
+        return len(self._body)
+
+    def _adopt(self, state) -> bool:
+        value = self.shared.read()
+        if value is None:
+            return False
+        meta, blobs = value
+        if meta.get("boot") != self.boot or meta["fingerprint"] != self.fingerprint or meta["state"] != state:
+            return False
+        self._body = blobs["identity"]
+        self._static = StaticBody(self._body, "text/html; charset=utf-8", brotli_quality=5,
+                                  variants={c: (blobs[c], etag) for c, etag in meta["etags"].items()})
+        return True
+
+    def _load_shared(self):
+        version, state = self.version, self.state()
+        if not self._adopt(state):
+            with self.shared.locked():
+                if not self._adopt(state):
+                    self._render()
+                    self._static = StaticBody(self._body, "text/html; charset=utf-8", brotli_quality=5)
+                    variants = self._static.variants
+                    self.shared.publish({"boot": self.boot, "fingerprint": self.fingerprint, "state": state,
+                                         "etags": {c: etag for c, (_, etag) in variants.items()}},
+                                        {c: b for c, (b, _) in variants.items()})
+        self._built_version = version
+
+    def static(self) -> StaticBody:
+        if self.shared is not None and self._built_version != self.version:
+            self._load_shared()
+        body = self.body()
+        if self._static is None:
+            # rebuilt on every feedback write, so trade a little ratio for speed
+            self._static = StaticBody(body, "text/html; charset=utf-8", brotli_quality=5)
+        return self._static
+
+class FeedbackPages:
+    """
+    Cursor pagination over FEEDBACKS, newest first. A cursor is the sequence
+    number (list position) to page back from. The list is append-only, so a
+    page with an explicit cursor never changes and its serialized JSON stays
+    in the LRU; only first pages (no cursor) are dropped on write.
+    """
+    def __init__(self, items: list, cache_size: int):
+        self.items = items
+        self.cache_size = cache_size
+        self._cache = collections.OrderedDict()
+
+    def invalidate_head(self):
+        for key in [k for k in self._cache if k[0] is None]:
+            del self._cache[key]
+
+    def page(self, cursor: Optional[int], limit: int) -> bytes:
+        total = len(self.items)
+        end = total if cursor is None else max(0, min(cursor, total))
+        key = (None if cursor is None else end, limit)
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+            return body
+        start = max(0, end - limit)
+        items = []
+        for seq in range(end - 1, start - 1, -1):
+            fb = self.items[seq]
+            items.append({"id": seq, "name": fb.name, "email": fb.email, "message": fb.message, "ts": fb.ts})
+        body = json.dumps({"items": items, "next_cursor": start if start > 0 else None}).encode("utf-8")
+        self._cache[key] = body
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return body
+
+FEEDBACK_PAGES = FeedbackPages(FEEDBACKS, FEEDBACK_PAGE_CACHE_SIZE)
+
+# ---------- Project search ----------
+PROJECT_SEARCH_LIMIT_MAX = 50
+PROJECT_SEARCH_CACHE_SIZE = 1024
+PROJECT_PREFIX_EXPANSION_MAX = 64
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+class ProjectIndex:
+    """
+    Inverted index over project titles, summaries and tags, built once per
+    content load. A query term matches every indexed token it is a prefix of
+    (bisect over the sorted vocabulary); all terms must match, and results rank
+    by summed term frequency. Serialized results are kept in an LRU keyed by
+    the normalized query until the index is rebuilt.
+    """
+    def __init__(self, projects: List[dict], cache_size: int = PROJECT_SEARCH_CACHE_SIZE):
+        self.projects = projects
+        self.cache_size = cache_size
+        self.postings = {}
+        self.by_tag = {}
+        self.by_year = {}
+        for doc, p in enumerate(projects):
+            tags = p.get("tags", [])
+            tokens = tokenize(p.get("title", "")) + tokenize(p.get("summary", ""))
+            for tag in tags:
+                tokens += tokenize(tag)
+                self.by_tag.setdefault(tag.lower(), set()).add(doc)
+            self.by_year.setdefault(str(p.get("year", "")), set()).add(doc)
+            for tok, tf in collections.Counter(tokens).items():
+                self.postings.setdefault(tok, {})[doc] = tf
+        self.vocab = sorted(self.postings)
+        self._cache = collections.OrderedDict()
+
+    def _expand(self, term: str) -> List[str]:
+        out = []
+        i = bisect.bisect_left(self.vocab, term)
+        while i < len(self.vocab) and self.vocab[i].startswith(term) and len(out) < PROJECT_PREFIX_EXPANSION_MAX:
+            out.append(self.vocab[i])
+            i += 1
+        return out
+
+    def _match(self, terms: List[str]) -> dict:
+        scores = None
+        for term in terms:
+            term_scores = {}
+            for tok in self._expand(term):
+                for doc, tf in self.postings[tok].items():
+                    term_scores[doc] = term_scores.get(doc, 0) + tf
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: sc + term_scores[doc] for doc, sc in scores.items() if doc in term_scores}
+            if not scores:
+                break
+        return scores or {}
+
+    def search(self, q: str = "", tag: str = "", year: str = "", limit: int = 20, offset: int = 0) -> bytes:
+        terms = tokenize(q)
+        tag = tag.strip().lower()
+        year = year.strip()
+        key = (" ".join(terms), tag, year, limit, offset)
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+            return body
+
+        allowed = None
+        if tag:
+            allowed = self.by_tag.get(tag, set())
+        if year:
+            docs = self.by_year.get(year, set())
+            allowed = docs if allowed is None else allowed & docs
+
+        if terms:
+            scores = self._match(terms)
+            if allowed is not None:
+                scores = {doc: sc for doc, sc in scores.items() if doc in allowed}
+            total = len(scores)
+            top = heapq.nsmallest(offset + limit, scores.items(), key=lambda kv: (-kv[1], kv[0]))[offset:]
+            docs = [doc for doc, _ in top]
+        elif allowed is not None:
+            total = len(allowed)
+            docs = heapq.nsmallest(offset + limit, allowed)[offset:]
+        else:
+            total = len(self.projects)
+            docs = range(offset, min(offset + limit, total))
+
+        body = json.dumps({"total": total, "items": [self.projects[doc] for doc in docs]}).encode("utf-8")
+        self._cache[key] = body
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return body
+
+PROJECT_INDEX = ProjectIndex(PROJECTS)
+
+# ---------- Related projects ----------
+RELATED_K = int(os.environ.get("RELATED_PROJECTS_K", "5"))
+RELATED_CARD_LINKS = 3
+RELATED_MAX_DF = 200  # a term shared by more projects than this says little about any pair
+RELATED_BLOCK = 2048
+RELATED_REBUILD_FRACTION = 0.2
+
+def project_terms(p: dict) -> List[str]:
+    terms = tokenize(p.get("title", "")) + tokenize(p.get("summary", ""))
+    for tag in p.get("tags", []):
+        terms += tokenize(tag)
+        terms.append("tag:" + tag.lower())
+    return terms
+
+def project_key(p: dict) -> tuple:
+    return (p.get("title", ""), p.get("summary", ""), tuple(p.get("tags", [])))
+
+def _expand(starts, lengths):
+    """Positions starts[i] .. starts[i] + lengths[i] - 1 for every i, concatenated."""
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(int(lengths.sum()))
+
+def _top_per_row(rows, docs, scores, keep: int):
+    """Best `keep` (doc, score) per row; returns the kept rows, ranks, docs and scores."""
+    # scores are cosines in [0, 1], so one stable float sort groups by row, best first
+    order = np.argsort(rows * 2.0 - scores, kind="stable")
+    rows, docs, scores = rows[order], docs[order], scores[order]
+    rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side="left")
+    sel = rank < keep
+    return rows[sel], rank[sel], docs[sel], scores[sel]
+
+class RelatedProjects:
+    """
+    The top-k most similar projects for every project: cosine similarity of
+    TF-IDF vectors over title, summary and tags (each tag also as one whole
+    token). Scores are accumulated with numpy over the postings of terms found
+    in at most RELATED_MAX_DF projects, so the work follows the pairs that
+    actually share a term rather than N squared, and only a top-k table is
+    kept (2k per row, so rows survive a neighbour being removed). update()
+    recomputes just the rows a content change touches, reusing the vocabulary
+    and IDF of the last full build, and rebuilds fully past
+    RELATED_REBUILD_FRACTION. Without numpy there are no related projects.
+    """
+    def __init__(self, projects: List[dict], k: int = RELATED_K):
+        self.projects = projects
+        self.k = k
+        self.keep = 2 * k
+        self.ids = [str(p.get("id", i)) for i, p in enumerate(projects)]
+        self.row = {pid: i for i, pid in enumerate(self.ids)}
+        self.keys = [project_key(p) for p in projects]
+        if load_numpy() is None:
+            self.nbr = None
+            return
+        self.vocab = {}
+        self.idf = np.zeros(0, dtype=np.float32)
+        lengths, indices, tf = self._terms([project_terms(p) for p in projects])
+        df = np.bincount(indices, minlength=len(self.vocab))
+        self.idf = (np.log((1.0 + len(projects)) / (1.0 + df)) + 1.0).astype(np.float32)
+        self._set_vectors(lengths, indices, self._weights(lengths, indices, tf))
+        self.nbr = np.full((len(projects), self.keep), -1, dtype=np.int32)
+        self.sim = np.zeros((len(projects), self.keep), dtype=np.float32)
+        self._recompute(np.arange(len(projects)))
+
+    # --- vectors ---
+    def _terms(self, docs: List[List[str]]):
+        """Per-document term counts as flat (lengths, term ids, tf) arrays; unseen terms join the vocabulary."""
+        lengths, ids, counts = [], [], []
+        vocab = self.vocab
+        for terms in docs:
+            counted = collections.Counter(terms)
+            lengths.append(len(counted))
+            ids.extend(vocab.setdefault(t, len(vocab)) for t in counted)
+            counts.extend(counted.values())
+        if len(vocab) > len(self.idf):
+            # new since the last full build: weigh them as terms seen once
+            rare = np.log((1.0 + len(self.projects)) / 2.0) + 1.0
+            self.idf = np.concatenate([self.idf, np.full(len(vocab) - len(self.idf), rare, dtype=np.float32)])
+        return (np.asarray(lengths, dtype=np.int64), np.asarray(ids, dtype=np.int64),
+                np.asarray(counts, dtype=np.float32))
+
+    def _weights(self, lengths, indices, tf):
+        """Sublinear tf times idf, L2-normalised per document."""
+        w = (1.0 + np.log(tf)) * self.idf[indices]
+        owner = np.repeat(np.arange(len(lengths)), lengths)
+        norm = np.sqrt(np.bincount(owner, weights=w * w, minlength=len(lengths)))
+        return (w / np.maximum(norm, 1e-12)[owner]).astype(np.float32)
+
+    def _set_vectors(self, lengths, indices, data):
+        self.indptr = np.concatenate(([0], np.cumsum(lengths)))
+        self.indices, self.data = indices, data
+        # postings of the discriminative terms, grouped by term
+        owner = np.repeat(np.arange(len(lengths)), lengths)
+        df = np.bincount(indices, minlength=len(self.vocab))
+        rare = df[indices] <= RELATED_MAX_DF
+        order = np.argsort(indices[rare], kind="stable")
+        self.post_docs = owner[rare][order]
+        self.post_w = data[rare][order]
+        self.post_ptr = np.concatenate(([0], np.cumsum(np.bincount(indices[rare], minlength=len(self.vocab)))))
+
+    # --- similarity ---
+    def _pairs(self, rows):
+        """(row, doc, score) with score > 0 for every doc sharing a rare term with each of `rows`."""
+        n = len(self.projects)
+        for start in range(0, len(rows), RELATED_BLOCK):
+            block = rows[start:start + RELATED_BLOCK]
+            lengths = self.indptr[block + 1] - self.indptr[block]
+            entries = _expand(self.indptr[block], lengths)
+            entry_row = np.repeat(block, lengths)
+            terms = self.indices[entries]
+            plen = self.post_ptr[terms + 1] - self.post_ptr[terms]
+            pos = _expand(self.post_ptr[terms], plen)
+            prow = np.repeat(entry_row, plen)
+            pdoc = self.post_docs[pos]
+            pval = np.repeat(self.data[entries], plen) * self.post_w[pos]
+            other = pdoc != prow
+            keys, inverse = np.unique(prow[other] * n + pdoc[other], return_inverse=True)
+            yield keys // n, keys % n, np.bincount(inverse, weights=pval[other])
+
+    def _store(self, rows, docs, scores):
+        rows, rank, docs, scores = _top_per_row(rows, docs, scores, self.keep)
+        self.nbr[rows, rank] = docs
+        self.sim[rows, rank] = scores
+
+    def _recompute(self, rows):
+        self.nbr[rows] = -1
+        self.sim[rows] = 0.0
+        for r, d, s in self._pairs(rows):
+            self._store(r, d, s)
+
+    # --- incremental update ---
+    def update(self, projects: List[dict]) -> "RelatedProjects":
+        if np is None or self.nbr is None:
+            return RelatedProjects(projects, self.k)
+        new_keys = [project_key(p) for p in projects]
+        new_ids = [str(p.get("id", i)) for i, p in enumerate(projects)]
+        old_to_new = np.full(len(self.projects), -1, dtype=np.int64)
+        changed = []
+        for i, (pid, key) in enumerate(zip(new_ids, new_keys)):
+            old = self.row.get(pid)
+            if old is not None and self.keys[old] == key and old_to_new[old] < 0:
+                old_to_new[old] = i
+            else:
+                changed.append(i)
+        dropped = int((old_to_new < 0).sum())
+        if len(changed) + dropped > RELATED_REBUILD_FRACTION * max(len(projects), 1):
+            return RelatedProjects(projects, self.k)
+
+        out = RelatedProjects.__new__(RelatedProjects)
+        out.projects, out.k, out.keep = projects, self.k, self.keep
+        out.ids, out.keys = new_ids, new_keys
+        out.row = {pid: i for i, pid in enumerate(new_ids)}
+        out.vocab, out.idf = dict(self.vocab), self.idf
+        kept_old = np.nonzero(old_to_new >= 0)[0]
+        kept_new = old_to_new[kept_old]
+        changed = np.asarray(changed, dtype=np.int64)
+        c_lengths, c_indices, c_tf = out._terms([project_terms(projects[i]) for i in changed])
+        # gather every new row from the old vectors or the freshly weighed ones
+        pool_indices = np.concatenate([self.indices, c_indices])
+        pool_data = np.concatenate([self.data, out._weights(c_lengths, c_indices, c_tf)])
+        lengths = np.zeros(len(projects), dtype=np.int64)
+        starts = np.zeros(len(projects), dtype=np.int64)
+        lengths[kept_new] = self.indptr[kept_old + 1] - self.indptr[kept_old]
+        starts[kept_new] = self.indptr[kept_old]
+        lengths[changed] = c_lengths
+        starts[changed] = len(self.indices) + np.concatenate(([0], np.cumsum(c_lengths)[:-1]))
+        pos = _expand(starts, lengths)
+        out._set_vectors(lengths, pool_indices[pos], pool_data[pos])
+
+        out.nbr = np.full((len(projects), out.keep), -1, dtype=np.int32)
+        out.sim = np.zeros((len(projects), out.keep), dtype=np.float32)
+        mapped = np.where(self.nbr[kept_old] >= 0, old_to_new[self.nbr[kept_old]], -1)
+        out.nbr[kept_new] = mapped
+        out.sim[kept_new] = np.where(mapped >= 0, self.sim[kept_old], 0.0)
+        # rows that lost a neighbour may now miss one that was ranked below it
+        lost = kept_new[((mapped < 0) & (self.nbr[kept_old] >= 0)).any(axis=1)]
+        out._recompute(np.union1d(changed, lost).astype(np.int64))
+        # the other rows only need the changed projects merged in (scores are symmetric)
+        fresh = np.ones(len(projects), dtype=bool)
+        fresh[changed] = False
+        fresh[lost] = False
+        for r, d, s in out._pairs(changed):
+            take = fresh[d]
+            rows, docs, scores = d[take], r[take], s[take]
+            if not len(rows):
+                continue
+            touched = np.unique(rows)
+            cur = out.nbr[touched]
+            valid = cur >= 0
+            rows = np.concatenate([rows, np.repeat(touched, valid.sum(axis=1))])
+            docs = np.concatenate([docs, cur[valid]])
+            scores = np.concatenate([scores, out.sim[touched][valid]])
+            out.nbr[touched] = -1
+            out.sim[touched] = 0.0
+            out._store(rows, docs, scores)
+        return out
+
+    # --- lookups ---
+    def related(self, project_id: str, limit: int) -> Optional[List[tuple]]:
+        """[(project, score)] best first, [] without numpy, None for an unknown id."""
+        row = self.row.get(project_id)
+        if row is None:
+            return None
+        if self.nbr is None:
+            return []
+        out = []
+        for doc, score in zip(self.nbr[row, :min(limit, self.k)], self.sim[row, :min(limit, self.k)]):
+            if doc < 0:
+                break
+            out.append((self.projects[doc], float(score)))
+        return out
+
+    def links_html(self, project_id: str) -> str:
+        items = self.related(project_id, RELATED_CARD_LINKS) or []
+        if not items:
+            return ""
+        links = " · ".join(f"<a href='#project-{escape_html(p.get('id', ''))}'>{escape_html(p['title'])}</a>"
+                           for p, _ in items)
+        return f"<div class='muted' style='margin-top:8px'>Related: {links}</div>"
+
+# Built by load_related_projects() once the server is up (numpy import plus the build);
+# until then the project cards have no "Related" links and the endpoint answers 503.
+RELATED_PROJECTS: Optional[RelatedProjects] = None
 
 # Build HTML fragments and JSON for scripts
-PROJECTS_HTML = build_projects_html(PROJECTS)
+PROJECTS_HTML = build_projects_html(PROJECTS, RELATED_PROJECTS)
 SKILLS_TECH_HTML = build_skills_html(SKILLS_TECHNICAL)
 SKILLS_TOOLS_HTML = build_skills_html(SKILLS_TOOLS)
 CERTS_HTML = build_certificates_html(CERTIFICATES)
-FEEDBACKS_HTML = build_feedbacks_html(FEEDBACKS)
 PROJECTS_JSON = json.dumps(PROJECTS).replace("</", "<\\/")
-FEEDBACKS_JSON = json.dumps(FEEDBACKS).replace("</", "<\\/")
-
-MAIN_HTML = (MAIN_HTML_TEMPLATE
-             .replace("{projects_html}", PROJECTS_HTML)
-             .replace("{skills_technical_html}", SKILLS_TECH_HTML)
-             .replace("{skills_tools_html}", SKILLS_TOOLS_HTML)
-             .replace("{certificates_html}", CERTS_HTML)
-             .replace("{initial_feedbacks_html}", FEEDBACKS_HTML)
-             .replace("{projects_json}", PROJECTS_JSON)
-             .replace("{feedbacks_json}", FEEDBACKS_JSON)
-             .replace("{resume_html}", RESUME_HTML.replace("</", "<\\/").replace("`", "\\`"))
-             .replace("{display_email}", escape_html(DISPLAY_EMAIL))
-             .replace("{year}", str(datetime.datetime.utcnow().year))
-             )
+
+MAIN_PAGE_SOURCE, STATIC_ASSETS = extract_assets(MAIN_HTML_TEMPLATE)
+MAIN_TEMPLATE = Template(MAIN_PAGE_SOURCE)
+
+def make_main_page(projects_html: str, skills_tech_html: str, skills_tools_html: str,
+                   certs_html: str, projects_json: str) -> MainPage:
+    return MainPage(MAIN_TEMPLATE.partial({
+        "projects_html": projects_html,
+        "skills_technical_html": skills_tech_html,
+        "skills_tools_html": skills_tools_html,
+        "certificates_html": certs_html,
+        "projects_json": projects_json,
+        "display_email": DISPLAY_EMAIL,
+        "year": datetime.datetime.utcnow().year,
+    }), {
+        "initial_feedbacks_html": lambda: build_feedbacks_html(FEEDBACKS),
+    }, state=lambda: f"{FEEDBACK_STORE.position()}:{len(FEEDBACKS)}", shared=SHARED_PAGE)
+
+MAIN_PAGE = make_main_page(PROJECTS_HTML, SKILLS_TECH_HTML, SKILLS_TOOLS_HTML, CERTS_HTML, PROJECTS_JSON)
+
+def add_feedbacks(entries: List[FeedbackRecord]):
+    if not entries:
+        return
+    FEEDBACKS.extend(entries)
+    MAIN_PAGE.invalidate()
+    FEEDBACK_PAGES.invalidate_head()
+
+# FEEDBACKS only grows from what the store reports, so every worker process
+# converges on the same list no matter which one accepted a submission.
+FEEDBACK_SYNC_INTERVAL = float(os.environ.get("FEEDBACK_SYNC_INTERVAL", "1.0"))
+_FEEDBACK_SYNC_LOCK = asyncio.Lock()
+_FEEDBACKS_LOADED = False
+
+async def load_feedbacks():
+    """Initial full load of the store, then warm the page cache for the first visitor."""
+    global _FEEDBACKS_LOADED
+    async with _FEEDBACK_SYNC_LOCK:
+        if not _FEEDBACKS_LOADED:
+            add_feedbacks(await asyncio.to_thread(load_submissions))
+            _FEEDBACKS_LOADED = True
+    MAIN_PAGE.static().variants
+
+async def sync_feedbacks():
+    async with _FEEDBACK_SYNC_LOCK:
+        # until the initial load has run, it will pick these up itself
+        if _FEEDBACKS_LOADED:
+            add_feedbacks(await asyncio.to_thread(read_new_submissions))
+
+async def watch_feedbacks():
+    while True:
+        await asyncio.sleep(FEEDBACK_SYNC_INTERVAL)
+        try:
+            await sync_feedbacks()
+        except Exception as e:
+            print("Feedback sync failed:", e)
+
+async def flush_feedback_store():
+    """fsync whatever append() left pending, so a lone submission is durable within FSYNC_INTERVAL."""
+    while True:
+        await asyncio.sleep(FSYNC_INTERVAL)
+        try:
+            await asyncio.to_thread(FEEDBACK_STORE.sync)
+        except Exception as e:
+            print("Feedback fsync failed:", e)
+
+def build_resume_body(html: str) -> StaticBody:
+    return StaticBody(html.encode("utf-8"), "text/html; charset=utf-8",
+                      cache_control="public, max-age=3600",
+                      headers={"Content-Disposition": 'attachment; filename="Divytosh_Resume.html"'})
+
+RESUME_BODY = build_resume_body(RESUME_HTML)
+
+# ---------- Abuse protection ----------
+FEEDBACK_RATE_PER_MIN = float(os.environ.get("FEEDBACK_RATE_PER_MIN", "5"))
+FEEDBACK_RATE_BURST = float(os.environ.get("FEEDBACK_RATE_BURST", "3"))
+RATE_LIMIT_MAX_CLIENTS = int(os.environ.get("RATE_LIMIT_MAX_CLIENTS", "10000"))
+def parse_networks(value: str) -> list:
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        try:
+            networks.append(ipaddress.ip_network(item, strict=False))
+        except ValueError:
+            print("Ignoring invalid TRUSTED_PROXIES entry:", item)
+    return networks
+
+TRUSTED_PROXIES = parse_networks(os.environ.get("TRUSTED_PROXIES", ""))
+DUPLICATE_WINDOW = float(os.environ.get("FEEDBACK_DUPLICATE_WINDOW", "3600"))
+DUPLICATE_CACHE_SIZE = int(os.environ.get("FEEDBACK_DUPLICATE_CACHE_SIZE", "4096"))
+NON_WORD_RE = re.compile(r"[\W_]+")
+
+def is_trusted_proxy(host: str) -> bool:
+    if not TRUSTED_PROXIES or not host:
+        return False
+    try:
+        addr = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return any(addr in net for net in TRUSTED_PROXIES)
+
+def client_ip(request: Request) -> str:
+    """The peer address, or the nearest untrusted X-Forwarded-For hop when the peer is a trusted proxy."""
+    peer = request.client.host if request.client else ""
+    if is_trusted_proxy(peer):
+        forwarded = request.headers.get("x-forwarded-for", "")
+        for hop in reversed(forwarded.split(",")):
+            hop = hop.strip()
+            if hop and not is_trusted_proxy(hop):
+                return hop
+    return peer
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets in an LRU-ordered dict. Buckets idle long enough to
+    be full again are equivalent to absent ones and are dropped from the cold
+    end; the dict never holds more than max_keys entries. Buckets live in
+    this process only, so each worker enforces the limit on its own.
+    """
+    def __init__(self, per_minute: float, burst: float, max_keys: int):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self.refill_time = burst / self.rate if self.rate > 0 else float("inf")
+        self._buckets = collections.OrderedDict()
+
+    def allow(self, key: str, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = self.burst
+            bucket = self._buckets[key] = [tokens, now]
+        else:
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            self._buckets.move_to_end(key)
+        allowed = tokens >= 1.0
+        bucket[0] = tokens - 1.0 if allowed else tokens
+        bucket[1] = now
+        self._expire(now)
+        return allowed
+
+    def _expire(self, now: float):
+        buckets = self._buckets
+        while buckets:
+            key, (_, last) = next(iter(buckets.items()))
+            if now - last < self.refill_time and len(buckets) <= self.max_keys:
+                break
+            buckets.popitem(last=False)
+
+class DuplicateFilter:
+    """
+    Remembers (client, content hash) of recent messages in a bounded LRU.
+    Messages are normalized (case, whitespace, punctuation) first, so trivially
+    varied resubmissions hash the same; two visitors writing the same short
+    message are not duplicates of each other. Checking and recording are
+    separate so a submission that was refused later (e.g. a full queue) can be
+    retried. Like the rate limiter, it only sees this worker's submissions.
+    """
+    def __init__(self, window: float, max_size: int):
+        self.window = window
+        self.max_size = max_size
+        self._seen = collections.OrderedDict()
+
+    @staticmethod
+    def fingerprint(message: str) -> bytes:
+        normalized = NON_WORD_RE.sub(" ", message.lower()).strip()
+        return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+
+    def key(self, client: str, message: str) -> tuple:
+        return client, self.fingerprint(message)
+
+    def seen(self, key: tuple, now: Optional[float] = None) -> bool:
+        """True if `key` was recorded within the window."""
+        now = time.monotonic() if now is None else now
+        last = self._seen.get(key)
+        return last is not None and now - last < self.window
+
+    def record(self, key: tuple, now: Optional[float] = None):
+        self._seen.pop(key, None)
+        self._seen[key] = time.monotonic() if now is None else now
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+FEEDBACK_LIMITER = TokenBucketLimiter(FEEDBACK_RATE_PER_MIN, FEEDBACK_RATE_BURST, RATE_LIMIT_MAX_CLIENTS)
+FEEDBACK_DUPLICATES = DuplicateFilter(DUPLICATE_WINDOW, DUPLICATE_CACHE_SIZE)
+
+# ---------- Content reload ----------
+def build_content_artifacts(sections: dict, changed: set) -> dict:
+    """
+    Rebuild only what depends on the changed sections. Returns new values for
+    module globals; runs in a thread so requests keep being served meanwhile.
+    """
+    g = globals()
+    out = {
+        "PROJECTS": sections["projects"],
+        "SKILLS_TECHNICAL": sections["skills_technical"],
+        "SKILLS_TOOLS": sections["skills_tools"],
+        "CERTIFICATES": sections["certificates"],
+        "ADDITIONAL_ACHIEVEMENTS": sections["additional_achievements"],
+    }
+    if "projects" in changed:
+        related = g["RELATED_PROJECTS"]
+        out["RELATED_PROJECTS"] = (RelatedProjects(out["PROJECTS"]) if related is None
+                                   else related.update(out["PROJECTS"]))
+        out["PROJECTS_HTML"] = build_projects_html(out["PROJECTS"], out["RELATED_PROJECTS"])
+        out["PROJECTS_JSON"] = json.dumps(out["PROJECTS"]).replace("</", "<\\/")
+        out["PROJECT_INDEX"] = ProjectIndex(out["PROJECTS"])
+    if "skills_technical" in changed:
+        out["SKILLS_TECH_HTML"] = build_skills_html(out["SKILLS_TECHNICAL"])
+    if "skills_tools" in changed:
+        out["SKILLS_TOOLS_HTML"] = build_skills_html(out["SKILLS_TOOLS"])
+    if "certificates" in changed:
+        out["CERTS_HTML"] = build_certificates_html(out["CERTIFICATES"])
+    if changed & {"skills_technical", "skills_tools", "certificates"}:
+        html = build_resume_html(out["SKILLS_TECHNICAL"] + out["SKILLS_TOOLS"], out["CERTIFICATES"])
+        out.update(RESUME_HTML=html, RESUME_HASH=resume_hash(html), RESUME_BODY=build_resume_body(html),
+                   _RESUME_PDF_BODY=None)
+    if changed & {"projects", "skills_technical", "skills_tools", "certificates"}:
+        fragment = lambda name: out.get(name, g[name])
+        out["MAIN_PAGE"] = make_main_page(fragment("PROJECTS_HTML"), fragment("SKILLS_TECH_HTML"),
+                                          fragment("SKILLS_TOOLS_HTML"), fragment("CERTS_HTML"),
+                                          fragment("PROJECTS_JSON"))
+    return out
+
+async def reload_content() -> bool:
+    polled = await asyncio.to_thread(CONTENT.poll)
+    if not polled:
+        return False
+    sections, changed, mtime = polled
+    if changed:
+        artifacts = await asyncio.to_thread(build_content_artifacts, sections, changed)
+        # Swap everything in one step on the event loop; no request sees a half-updated set.
+        globals().update(artifacts)
+    CONTENT.commit(sections, changed, mtime)
+    if changed:
+        print("Reloaded content:", ", ".join(sorted(changed)), "-> version", CONTENT.version)
+    return bool(changed)
+
+async def load_related_projects():
+    """Initial related-projects build, then put the "Related" links into the page."""
+    projects = PROJECTS
+    try:
+        related = await asyncio.to_thread(RelatedProjects, projects)
+        html = await asyncio.to_thread(build_projects_html, projects, related) if related.nbr is not None else None
+    except Exception as e:
+        print("Related projects build failed:", e)
+        return
+    if RELATED_PROJECTS is not None:
+        return  # a content reload changed the projects and built its own index meanwhile
+    globals()["RELATED_PROJECTS"] = related
+    if html is not None:
+        globals().update(PROJECTS_HTML=html,
+                         MAIN_PAGE=make_main_page(html, SKILLS_TECH_HTML, SKILLS_TOOLS_HTML, CERTS_HTML, PROJECTS_JSON))
+
+async def watch_content():
+    while True:
+        await asyncio.sleep(CONTENT_POLL_INTERVAL)
+        try:
+            await reload_content()
+        except Exception as e:
+            print("Content reload failed:", e)
 
 # ---------- Routes ----------
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    return HTMLResponse(content=MAIN_HTML, status_code=200)
+    return MAIN_PAGE.static().respond(request)
+
+@app.get("/static/{name}", response_class=Response)
+async def static_asset(name: str, request: Request):
+    asset = STATIC_ASSETS.get(name)
+    if asset is None:
+        return JSONResponse(status_code=404, content={"detail": "Not found"})
+    return asset.respond(request)
 
 @app.get("/resume", response_class=Response)
-async def download_resume():
-    headers = {
-        "Content-Type": "text/html; charset=utf-8",
-        "Content-Disposition": 'attachment; filename="Divytosh_Resume.html"'
-    }
-    return Response(content=RESUME_HTML, headers=headers)
+async def download_resume(request: Request):
+    return RESUME_BODY.respond(request)
+
+_RESUME_PDF_BODY: Optional[StaticBody] = None
+
+@app.get("/resume.pdf", response_class=Response)
+async def download_resume_pdf(request: Request):
+    global _RESUME_PDF_BODY
+    if _RESUME_PDF_BODY is None:
+        pdf = await asyncio.to_thread(render_resume_pdf)
+        if pdf is None:
+            return JSONResponse(status_code=404, content={"detail": "PDF resume is not available"})
+        _RESUME_PDF_BODY = StaticBody(pdf, "application/pdf", cache_control="public, max-age=3600",
+                                      headers={"Content-Disposition": 'attachment; filename="Divytosh_Resume.pdf"'})
+    return _RESUME_PDF_BODY.respond(request)
+
+class BodyTooLarge(Exception):
+    pass
+
+async def read_body_limited(req: Request, limit: int, timeout: float) -> bytes:
+    """
+    The request body, read as it streams in and abandoned as soon as it passes `limit`
+    bytes (a declared Content-Length over the limit is refused before reading anything).
+    The whole body must arrive within `timeout` seconds, so a slow drip cannot hold a
+    handler open.
+    """
+    declared = req.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise BodyTooLarge()
+    body = bytearray()
+    async with asyncio.timeout(timeout):
+        async for chunk in req.stream():
+            body += chunk
+            if len(body) > limit:
+                raise BodyTooLarge()
+    return bytes(body)
 
 @app.post("/api/feedback")
 async def submit_feedback(req: Request):
+    client = client_ip(req)
+    if not FEEDBACK_LIMITER.allow(client):
+        FEEDBACK_EVENTS["rejected", "rate_limited"] += 1
+        return JSONResponse(status_code=429, content={"detail": "Too many submissions. Please wait a minute and try again."},
+                            headers={"Retry-After": "60"})
+    if req.headers.get("content-type", "").split(";")[0].strip().lower() != "application/json":
+        FEEDBACK_EVENTS["rejected", "content_type"] += 1
+        return JSONResponse(status_code=415, content={"detail": "Send the feedback as application/json"})
     try:
-        payload = await req.json()
-    except Exception:
-        return JSONResponse(status_code=400, content={"detail": "Invalid JSON payload"})
+        body = await read_body_limited(req, FEEDBACK_MAX_BYTES, FEEDBACK_BODY_TIMEOUT)
+    except BodyTooLarge:
+        FEEDBACK_EVENTS["rejected", "too_large"] += 1
+        return JSONResponse(status_code=413, content={"detail": "Feedback is too large"}, headers={"Connection": "close"})
+    except TimeoutError:
+        FEEDBACK_EVENTS["rejected", "timeout"] += 1
+        return JSONResponse(status_code=408, content={"detail": "Request body took too long"}, headers={"Connection": "close"})
     try:
-        fb = FeedbackModel(**payload)
-    except ValidationError:
+        fb = FeedbackModel.model_validate_json(body)  # parse and validate the raw bytes in one pass
+    except ValidationError as e:
+        FEEDBACK_EVENTS["rejected", "invalid"] += 1
+        if any(err["type"] == "json_invalid" for err in e.errors()):
+            return JSONResponse(status_code=400, content={"detail": "Invalid JSON payload"})
         return JSONResponse(status_code=422, content={"detail": "Validation error"})
+    duplicate_key = FEEDBACK_DUPLICATES.key(client, fb.message)
+    if FEEDBACK_DUPLICATES.seen(duplicate_key):
+        FEEDBACK_EVENTS["rejected", "duplicate"] += 1
+        return JSONResponse(status_code=409, content={"detail": "This message was already received."})
+    now = datetime.datetime.utcnow()
     entry = {
         "name": fb.name or "Anonymous",
         "email": fb.email or "",
         "message": fb.message,
-        "_received_at": datetime.datetime.utcnow().isoformat() + "Z",
-        "ts": datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+        "_received_at": now.isoformat() + "Z",
+        "ts": now.strftime("%Y-%m-%d %H:%M UTC")
     }
-    FEEDBACKS.append(entry)
-    try:
-        save_submission(entry)
-    except Exception:
-        pass
-
-    # Try to forward via SMTP if configured
-    sent = False
-    smtp_info = ""
-    try:
-        subject = f"[Portfolio] New feedback from {entry['name']}"
-        body = f"Name: {entry['name']}\nEmail: {entry['email']}\nReceived: {entry['_received_at']}\n\nMessage:\n{entry['message']}"
-        sent = send_email_via_smtp(subject=subject, body=body, reply_to=entry['email'] or None)
-        smtp_info = " (forwarded via email)" if sent else ""
-    except Exception:
-        smtp_info = ""
-
-    return JSONResponse(status_code=200, content={"detail": "Thanks — your feedback was received." + smtp_info, "ts": entry["ts"]})
+    # Persistence and email run on the background worker; a full queue is backpressure.
+    if FEEDBACK_QUEUE is not None:
+        try:
+            FEEDBACK_QUEUE.put_nowait(entry)
+        except asyncio.QueueFull:
+            FEEDBACK_EVENTS["rejected", "queue_full"] += 1
+            return JSONResponse(status_code=429, content={"detail": "Too many submissions right now. Please try again shortly."},
+                                headers={"Retry-After": "5"})
+        FEEDBACK_DUPLICATES.record(duplicate_key)
+    else:
+        FEEDBACK_DUPLICATES.record(duplicate_key)
+        await asyncio.to_thread(process_feedback, [entry])
+        await sync_feedbacks()
+    FEEDBACK_EVENTS["accepted", ""] += 1
+
+    return JSONResponse(status_code=202, content={"detail": "Thanks — your feedback was received.", "ts": entry["ts"],
+                                                  "html": FEEDBACK_CARDS.card(FeedbackRecord.from_entry(entry))})
+
+@app.get("/api/feedback")
+async def list_feedback(cursor: Optional[int] = None, limit: int = 20):
+    limit = max(1, min(limit, FEEDBACK_PAGE_MAX))
+    return Response(content=FEEDBACK_PAGES.page(cursor, limit), media_type="application/json")
+
+@app.get("/api/projects")
+async def search_projects(q: str = "", tag: str = "", year: str = "", limit: int = 20, offset: int = 0):
+    limit = max(1, min(limit, PROJECT_SEARCH_LIMIT_MAX))
+    offset = max(0, offset)
+    return Response(content=PROJECT_INDEX.search(q, tag, year, limit, offset), media_type="application/json")
+
+@app.get("/api/projects/{project_id}/related")
+async def related_projects(project_id: str, limit: int = RELATED_K):
+    related = RELATED_PROJECTS
+    if related is None:
+        return JSONResponse(status_code=503, content={"detail": "Related projects are still being built"},
+                            headers={"Retry-After": "1"})
+    if related.nbr is None:
+        return JSONResponse(status_code=404, content={"detail": "Related projects are not available"})
+    items = related.related(project_id, max(1, limit))
+    if items is None:
+        return JSONResponse(status_code=404, content={"detail": "Unknown project"})
+    return JSONResponse(content={"project": project_id,
+                                 "related": [dict(p, score=round(score, 4)) for p, score in items]})
+
+@app.get("/api/mail/status")
+async def mail_status():
+    return JSONResponse(content=dict(MAILER.status(),
+                                     queue_depth=FEEDBACK_QUEUE.qsize() if FEEDBACK_QUEUE is not None else 0))
 
 @app.get("/health")
 async def health():
-    return JSONResponse(content={"status": "ok", "timestamp": datetime.datetime.utcnow().isoformat() + "Z"})
+    return JSONResponse(content={"status": "ok", "timestamp": datetime.datetime.utcnow().isoformat() + "Z",
+                                 "content_version": CONTENT.version})
+
+# ---------- Export ----------
+EXPORT_TOKEN = os.environ.get("EXPORT_TOKEN")
+EXPORT_CHUNK_RECORDS = 1000
+EXPORT_FIELDS = ("name", "email", "message", "_received_at", "ts", "held")
+
+def export_chunks(fmt: str, since: str, compress: bool):
+    """Stream the store as NDJSON or CSV, one encoded (and optionally gzipped) block per record chunk."""
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if fmt == "csv":
+        writer.writerow(EXPORT_FIELDS)
+    for records in FEEDBACK_STORE.iter_records(since, EXPORT_CHUNK_RECORDS):
+        if fmt == "csv":
+            writer.writerows([r.get(k) or "" for k in EXPORT_FIELDS] for r in records)
+        else:
+            buf.write("".join(json.dumps({k: r.get(k) for k in EXPORT_FIELDS}, ensure_ascii=False) + "\n"
+                              for r in records))
+        data = buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+        if gz is not None:
+            data = gz.compress(data)
+        if data:
+            yield data
+    tail = buf.getvalue().encode("utf-8")
+    if gz is not None:
+        tail = gz.compress(tail) + gz.flush()
+    if tail:
+        yield tail
+
+@app.get("/api/feedback/export")
+async def export_feedback(request: Request, format: str = "ndjson", since: str = ""):
+    if not EXPORT_TOKEN:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    auth = request.headers.get("authorization", "")
+    if not hmac.compare_digest(auth.encode("utf-8"), f"Bearer {EXPORT_TOKEN}".encode("utf-8")):
+        return JSONResponse(status_code=401, content={"detail": "Unauthorized"}, headers={"WWW-Authenticate": "Bearer"})
+    if format not in ("ndjson", "csv"):
+        return JSONResponse(status_code=400, content={"detail": "format must be ndjson or csv"})
+    if since:
+        try:
+            datetime.datetime.fromisoformat(since.removesuffix("Z"))
+        except ValueError:
+            return JSONResponse(status_code=400, content={"detail": "since must be an ISO 8601 date or datetime"})
+    compress = accepted_encodings(request.headers.get("accept-encoding", "")).get("gzip", 0.0) > 0
+    headers = {
+        "Content-Disposition": f'attachment; filename="feedback.{format}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    media_type = "text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(export_chunks(format, since, compress), media_type=media_type, headers=headers)
+
+def render_metrics() -> str:
+    lines = ["# HELP portfolio_http_request_duration_seconds Request latency by route.",
+             "# TYPE portfolio_http_request_duration_seconds histogram"]
+    for (method, route), hist in list(REQUEST_LATENCY.items()):
+        lines += hist.render("portfolio_http_request_duration_seconds", f'method="{method}",route="{route}"')
+    lines += ["# HELP portfolio_http_requests_total Requests by route and status.",
+              "# TYPE portfolio_http_requests_total counter"]
+    for (method, route, status), n in list(REQUEST_COUNT.items()):
+        lines.append(f'portfolio_http_requests_total{{method="{method}",route="{route}",status="{status}"}} {n}')
+    lines += ["# HELP portfolio_feedback_events_total Feedback accepted, rejected, emailed and failed.",
+              "# TYPE portfolio_feedback_events_total counter"]
+    for (event, reason), n in list(FEEDBACK_EVENTS.items()):
+        lines.append(f'portfolio_feedback_events_total{{event="{event}",reason="{reason}"}} {n}')
+    lines += ["# HELP portfolio_stage_duration_seconds Time spent in storage and SMTP delivery.",
+              "# TYPE portfolio_stage_duration_seconds histogram"]
+    for stage, hist in STAGE_LATENCY.items():
+        lines += hist.render("portfolio_stage_duration_seconds", f'stage="{stage}"')
+    gauges = [
+        ("portfolio_feedbacks", "Feedback entries held in memory.", len(FEEDBACKS)),
+        ("portfolio_main_page_bytes", "Size of the main page as last built or adopted.", MAIN_PAGE.cached_size()),
+        ("portfolio_feedback_queue_depth", "Submissions waiting for the background worker.",
+         FEEDBACK_QUEUE.qsize() if FEEDBACK_QUEUE is not None else 0),
+        ("portfolio_mail_outbox", "Messages waiting in the mail outbox.", len(MAILER.pending)),
+        ("portfolio_mail_breaker_open", "1 while the SMTP circuit breaker is open.",
+         int(MAILER.breaker.state == "open")),
+    ]
+    for name, help_text, value in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return "\n".join(lines) + "\n"
+
+@app.get("/metrics")
+async def metrics():
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.get("/robots.txt")
-async def robots():
-    return Response(content="User-agent: *\nAllow: /\nSitemap: /sitemap.xml\n", media_type="text/plain")
+async def robots(request: Request):
+    return SITE_FILES.get("robots", site_url(request)).respond(request)
+
+# ---------- Sitemap ----------
+SITEMAP_EXCLUDE = {"/health", "/metrics", "/robots.txt", "/sitemap.xml"}
+SITE_FILES_MAX_HOSTS = 16
+HOST_RE = re.compile(r"^[A-Za-z0-9.-]{1,253}(:[0-9]{1,5})?$")  # a DNS name is at most 253 characters
+
+def site_url(request: Request) -> str:
+    """SITE_URL, else scheme://host of the request (forwarded headers only from TRUSTED_PROXIES)."""
+    if SITE_URL:
+        return SITE_URL
+    # straight from the scope; building request.url costs more than the cached response
+    scheme, host = request.scope.get("scheme", "http"), request.headers.get("host", "")
+    if is_trusted_proxy(request.client.host if request.client else ""):
+        scheme = request.headers.get("x-forwarded-proto", scheme).split(",")[0].strip()
+        host = request.headers.get("x-forwarded-host", host).split(",")[0].strip()
+    if scheme not in ("http", "https") or not HOST_RE.match(host):
+        return "http://127.0.0.1:8000"
+    return f"{scheme}://{host}"
+
+def sitemap_paths() -> List[str]:
+    """Plain GET pages from the route table; APIs, parameterized and operational routes are left out."""
+    paths = []
+    for route in app.routes:
+        path = getattr(route, "path", "")
+        if ("GET" not in (getattr(route, "methods", None) or ()) or not getattr(route, "include_in_schema", False)
+                or "{" in path or path.startswith("/api/") or path in SITEMAP_EXCLUDE):
+            continue
+        if path == "/resume.pdf" and importlib.util.find_spec("weasyprint") is None:
+            continue
+        paths.append(path)
+    return paths
+
+def build_sitemap_xml(base: str) -> bytes:
+    modified = CONTENT.modified or os.path.getmtime(__file__)
+    lastmod = datetime.datetime.fromtimestamp(modified, datetime.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+00:00")
+    urls = [base + path for path in sitemap_paths()]
+    urls += [f"{base}/#project-{p['id']}" for p in PROJECTS if p.get("id")]
+    items = "\n".join(f"<url><loc>{escape_html(u)}</loc><lastmod>{lastmod}</lastmod><changefreq>monthly</changefreq></url>"
+                      for u in urls)
+    xml = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{items}\n</urlset>'
+    return xml.encode("utf-8")
+
+def build_robots_txt(base: str) -> bytes:
+    return f"User-agent: *\nAllow: /\nSitemap: {base}/sitemap.xml\n".encode("utf-8")
+
+class SiteFiles:
+    """
+    sitemap.xml and robots.txt per site URL as precompressed StaticBody
+    objects. Everything is dropped when the content version moves; a small
+    LRU bounds the number of hosts kept.
+    """
+    BUILDERS = {
+        "sitemap": (build_sitemap_xml, "application/xml"),
+        "robots": (build_robots_txt, "text/plain; charset=utf-8"),
+    }
+
+    def __init__(self, max_hosts: int):
+        self.max_entries = max_hosts * len(self.BUILDERS)
+        self._version = None
+        self._cache = collections.OrderedDict()
+
+    def get(self, kind: str, base: str) -> StaticBody:
+        if self._version != CONTENT.version:
+            self._cache.clear()
+            self._version = CONTENT.version
+        key = (kind, base)
+        body = self._cache.get(key)
+        if body is not None:
+            self._cache.move_to_end(key)
+            return body
+        build, media_type = self.BUILDERS[kind]
+        body = self._cache[key] = StaticBody(build(base), media_type, cache_control="public, max-age=86400")
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return body
+
+SITE_FILES = SiteFiles(SITE_FILES_MAX_HOSTS)
 
 @app.get("/sitemap.xml")
-async def sitemap():
-    host = "http://127.0.0.1:8000"
-    urls = [f"{host}/"]
-    items = "\n".join(f"<url><loc>{u}</loc><changefreq>monthly</changefreq></url>" for u in urls)
-    xml = f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n{items}\n</urlset>'
-    return Response(content=xml, media_type="application/xml")
+async def sitemap(request: Request):
+    return SITE_FILES.get("sitemap", site_url(request)).respond(request)
 
 # ---------- Run ----------
 if __name__ == "__main__":
-    uvicorn.run("portfolio_fastapi_final3:app", host="127.0.0.1", port=8000, reload=False)
\ No newline at end of file
+    uvicorn.run("portfolio_fastapi_final3:app", host="127.0.0.1", port=8000, reload=False, workers=WEB_CONCURRENCY)
\ No newline at end of file
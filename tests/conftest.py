@@ -0,0 +1,36 @@
+"""
+Shared setup: the app keeps its stores, outbox and caches relative to the
+working directory and reads its settings at import, so the session runs in a
+scratch directory with the environment below before the module is imported.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix="portfolio-tests-")
+os.chdir(WORKDIR)
+sys.path.insert(0, ROOT)
+for name in ("SMTP_HOST", "SMTP_PORT", "SMTP_USER", "SMTP_PASS", "WEB_CONCURRENCY"):
+    os.environ.pop(name, None)
+os.environ.update({
+    "SHARED_PAGE_FILE": "",
+    "FEEDBACK_RATE_PER_MIN": "100000",
+    "FEEDBACK_RATE_BURST": "100000",
+    "FEEDBACK_DUPLICATE_WINDOW": "0",
+    "FEEDBACK_SYNC_INTERVAL": "0.05",
+})
+
+import portfolio_fastapi_final3  # noqa: E402
+
+@pytest.fixture(scope="session")
+def app_module():
+    return portfolio_fastapi_final3
+
+@pytest.fixture
+def client(app_module):
+    from fastapi.testclient import TestClient
+    with TestClient(app_module.app) as c:
+        yield c
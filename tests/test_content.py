@@ -0,0 +1,68 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+SWAPPED = ("CONTENT", "PROJECTS", "SKILLS_TECHNICAL", "SKILLS_TOOLS", "CERTIFICATES", "ADDITIONAL_ACHIEVEMENTS",
+           "RELATED_PROJECTS", "PROJECTS_HTML", "PROJECTS_JSON", "PROJECT_INDEX", "SKILLS_TECH_HTML",
+           "SKILLS_TOOLS_HTML", "CERTS_HTML", "RESUME_HTML", "RESUME_HASH", "RESUME_BODY", "_RESUME_PDF_BODY",
+           "MAIN_PAGE")
+
+def write(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(data if isinstance(data, str) else json.dumps(data))
+
+def store(app_module, path):
+    return app_module.ContentStore(str(path), dict(app_module.CONTENT.defaults))
+
+def test_malformed_section_keeps_the_defaults(app_module, tmp_path):
+    path = tmp_path / "content.json"
+    write(path, {"projects": [{"id": "x", "title": "No summary"}], "skills_tools": ["Excel"]})
+    content = store(app_module, path)
+    sections, changed, _ = content.poll()
+    assert changed == {"skills_tools"}
+    assert sections["projects"] == content.defaults["projects"]
+    assert sections["skills_tools"] == ["Excel"]
+
+@pytest.mark.parametrize("data", ["[1, 2]", "{not json", {"certificates": "one"}, {"projects": [{"title": "t", "summary": "s", "tags": "AI"}]}])
+def test_unusable_files_change_nothing(app_module, tmp_path, data):
+    path = tmp_path / "content.json"
+    write(path, data)
+    polled = store(app_module, path).poll()
+    assert polled is None or polled[1] == set()
+
+def test_app_starts_with_a_malformed_content_file(tmp_path):
+    path = tmp_path / "content.json"
+    write(path, {"projects": [{"id": "x", "title": "No summary"}]})
+    code = "import portfolio_fastapi_final3 as m; print(len(m.PROJECTS) == len(m.CONTENT.defaults['projects']))"
+    env = dict(os.environ, CONTENT_FILE=str(path))
+    out = subprocess.run([sys.executable, "-c", code], cwd=tmp_path, env=dict(env, PYTHONPATH=ROOT),
+                         capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "True"
+    assert "Ignoring projects" in out.stdout
+
+def test_reload_swaps_the_page_and_bumps_the_version(app_module, client, tmp_path, monkeypatch):
+    for name in SWAPPED:
+        monkeypatch.setattr(app_module, name, getattr(app_module, name))
+    path = tmp_path / "content.json"
+    monkeypatch.setattr(app_module, "CONTENT", store(app_module, path))
+    version = client.get("/health").json()["content_version"]
+    write(path, {"projects": [
+        {"id": "new", "title": "Brand <New> Project", "summary": "Fresh", "github": "javascript:alert(1)"},
+        {"id": "ok", "title": "Linked", "summary": "Safe link", "github": "https://example.com/a?b=1&c='2'"},
+    ]})
+    assert asyncio.run(app_module.reload_content())
+    assert client.get("/health").json()["content_version"] == version + 1
+    page = client.get("/").text
+    assert "Brand &lt;New&gt; Project" in page
+    assert "href='javascript:" not in page
+    assert "href='#' target='_blank'>View on GitHub" in page
+    assert "href='https://example.com/a?b=1&amp;c=&#39;2&#39;'" in page
+    assert json.loads(client.get("/api/projects", params={"q": "brand"}).content)["total"] == 1
+    assert not asyncio.run(app_module.reload_content())  # unchanged file: nothing to do
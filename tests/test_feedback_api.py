@@ -0,0 +1,228 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+def post(client, message: str, **headers):
+    return client.post("/api/feedback", json={"name": "Tester", "email": "t@example.com", "message": message},
+                       headers=headers)
+
+@pytest.fixture
+def duplicates(app_module, monkeypatch):
+    dup = app_module.DuplicateFilter(3600, 100)
+    monkeypatch.setattr(app_module, "FEEDBACK_DUPLICATES", dup)
+    return dup
+
+def test_duplicate_from_same_client_is_refused(client, duplicates):
+    assert post(client, "Lovely dashboards").status_code == 202
+    assert post(client, "lovely   dashboards!").status_code == 409
+
+def test_duplicates_are_per_client(duplicates):
+    a = duplicates.key("10.0.0.1", "Great work!")
+    b = duplicates.key("10.0.0.2", "great work")
+    duplicates.record(a)
+    assert duplicates.seen(a)
+    assert not duplicates.seen(b)
+
+def test_queue_full_does_not_mark_message_as_received(app_module, client, duplicates, monkeypatch):
+    full = asyncio.Queue(maxsize=1)
+    full.put_nowait({})
+    real = app_module.FEEDBACK_QUEUE
+    monkeypatch.setattr(app_module, "FEEDBACK_QUEUE", full)
+    assert post(client, "Please retry me").status_code == 429
+    monkeypatch.setattr(app_module, "FEEDBACK_QUEUE", real)
+    assert post(client, "Please retry me").status_code == 202
+
+class FakeRequest:
+    def __init__(self, peer: str, forwarded: str = ""):
+        self.client = type("Client", (), {"host": peer})()
+        self.headers = {"x-forwarded-for": forwarded} if forwarded else {}
+
+def test_trusted_proxies_accept_cidr_ranges(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "TRUSTED_PROXIES", app_module.parse_networks("10.0.0.0/8, 192.168.1.5, fd00::/8, bogus"))
+    assert app_module.client_ip(FakeRequest("10.42.7.9", "203.0.113.7, 10.1.1.1")) == "203.0.113.7"
+    assert app_module.client_ip(FakeRequest("192.168.1.5", "198.51.100.2")) == "198.51.100.2"
+    assert app_module.client_ip(FakeRequest("fd12::1", "2001:db8::5")) == "2001:db8::5"
+    # an untrusted peer's header is ignored
+    assert app_module.client_ip(FakeRequest("203.0.113.9", "1.2.3.4")) == "203.0.113.9"
+    assert app_module.client_ip(FakeRequest("testclient", "1.2.3.4")) == "testclient"
+
+class BrokenModel:
+    def score(self, texts):
+        raise ValueError("corrupt weights")
+
+def test_spam_scoring_failure_stores_batch_unscored(app_module, monkeypatch):
+    stored = []
+    monkeypatch.setattr(app_module, "SPAM_MODEL", BrokenModel())
+    monkeypatch.setattr(app_module, "save_submission", stored.append)
+    before = app_module.FEEDBACK_EVENTS["failed", "spam"]
+    entries = [{"name": f"N{i}", "email": "", "message": "hello", "_received_at": "now"} for i in range(3)]
+    app_module.process_feedback(entries)
+    assert stored == entries
+    assert not any(e.get("held") for e in stored)
+    assert app_module.FEEDBACK_EVENTS["failed", "spam"] == before + 3
+
+async def raw_post(app_module, chunks, delay: float = 0.0, headers=()) -> tuple:
+    """Drive the ASGI app with a chunked body; returns (status, body bytes consumed, seconds)."""
+    consumed = 0
+    status = None
+    pending = list(chunks)
+
+    async def receive():
+        nonlocal consumed
+        if delay:
+            await asyncio.sleep(delay)
+        chunk = pending.pop(0) if pending else b""
+        consumed += len(chunk)
+        return {"type": "http.request", "body": chunk, "more_body": bool(pending)}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+             "scheme": "http", "path": "/api/feedback", "raw_path": b"/api/feedback", "query_string": b"",
+             "root_path": "", "headers": [(b"host", b"test"), (b"content-type", b"application/json"), *headers],
+             "client": ("127.0.0.1", 1), "server": ("test", 80)}
+    start = time.perf_counter()
+    await app_module.app(scope, receive, send)
+    return status, consumed, time.perf_counter() - start
+
+def test_oversized_chunked_body_is_cut_off_early(app_module):
+    status, consumed, _ = asyncio.run(raw_post(app_module, [b"x" * 65536] * 80))  # 5 MiB, no Content-Length
+    assert status == 413
+    assert consumed <= app_module.FEEDBACK_MAX_BYTES + 65536
+
+def test_oversized_declared_length_is_refused_unread(app_module):
+    size = str(app_module.FEEDBACK_MAX_BYTES + 1).encode()
+    status, consumed, _ = asyncio.run(raw_post(app_module, [b"x" * 65536], headers=[(b"content-length", size)]))
+    assert (status, consumed) == (413, 0)
+
+def test_slow_drip_times_out(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "FEEDBACK_BODY_TIMEOUT", 0.3)
+    status, _, seconds = asyncio.run(raw_post(app_module, [b" "] * 100, delay=0.05))  # 5 s of one-byte chunks
+    assert status == 408
+    assert seconds < 1.0
+
+def test_body_must_be_a_json_object(client):
+    assert client.post("/api/feedback", content=b"message=hi",
+                       headers={"Content-Type": "application/x-www-form-urlencoded"}).status_code == 415
+    assert client.post("/api/feedback", content=b"{not json",
+                       headers={"Content-Type": "application/json"}).status_code == 400
+    assert client.post("/api/feedback", json=["a", "list"]).status_code == 422
+    assert client.post("/api/feedback", json={"name": "x", "message": "m" * 6000}).status_code == 422
+
+def test_burst_then_429_with_retry_after(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "FEEDBACK_LIMITER", app_module.TokenBucketLimiter(5, 3, 100))
+    statuses = [post(client, f"burst {i}").status_code for i in range(5)]
+    assert statuses == [202, 202, 202, 429, 429]
+    r = post(client, "one more")
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "60"
+
+def test_bucket_refills_over_time(app_module):
+    limiter = app_module.TokenBucketLimiter(6, 2, 100)  # one token per 10 s
+    assert [limiter.allow("ip", now=0.0) for _ in range(3)] == [True, True, False]
+    assert not limiter.allow("ip", now=5.0)
+    assert limiter.allow("ip", now=15.1)
+    assert not limiter.allow("ip", now=15.2)
+    # a client idle long enough is back to a full burst
+    assert [limiter.allow("ip", now=100.0) for _ in range(3)] == [True, True, False]
+
+def test_duplicates_are_suppressed_only_within_the_window(app_module):
+    dup = app_module.DuplicateFilter(60, 100)
+    key = dup.key("10.0.0.1", "Nice site")
+    dup.record(key, now=0.0)
+    assert dup.seen(dup.key("10.0.0.1", "  nice SITE!! "), now=59.0)
+    assert not dup.seen(key, now=61.0)
+
+def test_tables_stay_capped_under_many_clients(app_module):
+    limiter = app_module.TokenBucketLimiter(5, 3, 1000)
+    dup = app_module.DuplicateFilter(3600, 1000)
+    for i in range(50_000):
+        ip = f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+        assert limiter.allow(ip, now=i * 1e-4)
+        dup.record(dup.key(ip, "spam"), now=i * 1e-4)
+    assert len(limiter._buckets) <= 1000
+    assert len(dup._seen) <= 1000
+    # the most recent clients are the ones kept
+    assert "10.0.195.79" in limiter._buckets and "10.0.0.0" not in limiter._buckets
+    assert dup.seen(dup.key("10.0.195.79", "spam"), now=5.0)
+    assert not dup.seen(dup.key("10.0.0.0", "spam"), now=5.0)
+
+def write_log(app_module, path, count: int, message: str = "hello") -> "app_module.FeedbackLog":
+    with open(path, "wb") as f:
+        for i in range(count):
+            f.write(app_module.encode_record({"name": f"n{i}", "email": f"n{i}@example.com", "message": f"{message} {i}",
+                                              "_received_at": f"2026-01-{1 + i % 28:02d}T12:00:00Z",
+                                              "ts": "2026-01-01 12:00 UTC"}))
+    return app_module.FeedbackLog(str(path))
+
+@pytest.fixture
+def export_store(app_module, tmp_path, monkeypatch):
+    log = write_log(app_module, tmp_path / "export.jsonl", 56)
+    monkeypatch.setattr(app_module, "FEEDBACK_STORE", log)
+    monkeypatch.setattr(app_module, "EXPORT_TOKEN", "s3cret")
+    yield log
+    log.close()
+
+def export(client, token: str = "s3cret", encoding: str = "identity", **params):
+    headers = {"Accept-Encoding": encoding}
+    if token is not None:
+        headers["Authorization"] = f"Bearer {token}"
+    return client.get("/api/feedback/export", params=params, headers=headers)
+
+def test_export_requires_the_token(client, export_store):
+    assert export(client, token=None).status_code == 401
+    r = export(client, token="wrong")
+    assert r.status_code == 401
+    assert r.headers["www-authenticate"] == "Bearer"
+
+def test_export_ndjson_and_csv(client, export_store):
+    import csv
+    import io
+    import json
+    r = export(client)
+    assert r.status_code == 200
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert len(rows) == 56
+    assert rows[0]["message"] == "hello 0" and set(rows[0]) == {"name", "email", "message", "_received_at", "ts", "held"}
+    r = export(client, format="csv")
+    table = list(csv.reader(io.StringIO(r.text)))
+    assert table[0] == ["name", "email", "message", "_received_at", "ts", "held"]
+    assert len(table) == 57 and table[1][2] == "hello 0"
+    assert export(client, format="xml").status_code == 400
+
+def test_export_since_filter(client, export_store):
+    r = export(client, since="2026-01-27")
+    received = {line.split('"_received_at": "')[1][:10] for line in r.text.splitlines()}
+    assert received == {"2026-01-27", "2026-01-28"}
+    assert len(r.text.splitlines()) == 4
+    assert export(client, since="last week").status_code == 400
+
+def test_export_gzip(client, export_store):
+    r = export(client, encoding="gzip")
+    assert r.headers["content-encoding"] == "gzip"
+    assert len(r.text.splitlines()) == 56  # decoded by the client
+
+def export_peak(app_module, path, count: int, fmt: str, compress: bool) -> int:
+    import tracemalloc
+    log = write_log(app_module, path, count, message="x" * 200)
+    app_module.FEEDBACK_STORE = log
+    tracemalloc.start()
+    try:
+        assert sum(len(chunk) for chunk in app_module.export_chunks(fmt, "", compress)) > 0
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        log.close()
+
+@pytest.mark.parametrize("fmt, compress", [("ndjson", False), ("csv", True)])
+def test_export_memory_stays_flat_on_a_large_log(app_module, tmp_path, monkeypatch, fmt, compress):
+    monkeypatch.setattr(app_module, "FEEDBACK_STORE", app_module.FEEDBACK_STORE)
+    small = export_peak(app_module, tmp_path / "small.jsonl", 3_000, fmt, compress)
+    large = export_peak(app_module, tmp_path / "large.jsonl", 30_000, fmt, compress)  # ~10 MB on disk
+    # bounded by one chunk of EXPORT_CHUNK_RECORDS, not by the size of the log
+    assert large < small * 1.5 and large < 8 * 1024 * 1024, (small, large)
@@ -0,0 +1,330 @@
+"""
+MailDispatcher against a local aiosmtpd server whose handler can add latency
+and fail commands on demand.
+"""
+import asyncio
+import os
+import socket
+import time
+
+import pytest
+
+aiosmtpd_controller = pytest.importorskip("aiosmtpd.controller")
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+class Handler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        self.rcpt_attempts = 0
+        self.rcpt_delay = 0.0
+        self.rcpt_reply = None  # e.g. "451 Try later" to fail every RCPT
+        self.reject_marker = None  # DATA containing this text is refused with 554
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        self.rcpt_attempts += 1
+        if self.rcpt_delay:
+            await asyncio.sleep(self.rcpt_delay)
+        if self.rcpt_reply:
+            return self.rcpt_reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reject_marker and self.reject_marker.encode() in envelope.content:
+            return "554 5.7.1 Message content rejected"
+        self.sessions.add(id(session))
+        self.messages.append(envelope.content.decode("utf-8", "replace"))
+        return "250 OK queued"
+
+@pytest.fixture
+def smtp_server():
+    handler = Handler()
+    controller = aiosmtpd_controller.Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield handler, controller.port
+    controller.stop()
+
+@pytest.fixture
+def mail_env(app_module, smtp_server, monkeypatch):
+    handler, port = smtp_server
+    settings = {
+        "SMTP_HOST": "127.0.0.1", "SMTP_PORT": port, "SMTP_USER": "site@example.com", "SMTP_PASS": None,
+        "SMTP_STARTTLS": False, "CONTACT_RECEIVER": "owner@example.com",
+        "MAIL_BACKOFF_BASE": 0.05, "MAIL_BACKOFF_MAX": 0.1, "MAIL_OUTBOX_POLL": 0.05,
+        "MAIL_DIGEST_THRESHOLD": 1000, "MAIL_SEND_DEADLINE": 2.0, "MAIL_MAX_ATTEMPTS": 50,
+    }
+    for name, value in settings.items():
+        monkeypatch.setattr(app_module, name, value)
+    handler.port = port
+    return handler
+
+def make_dispatcher(app_module, tmp_path, threshold: int = 3, cooldown: float = 300.0):
+    mailer = app_module.MailDispatcher(str(tmp_path / "outbox"))
+    mailer.breaker = app_module.CircuitBreaker(threshold, cooldown)
+    return mailer
+
+def outbox_files(tmp_path) -> list:
+    return sorted(n for n in os.listdir(tmp_path / "outbox") if n.endswith(".json"))
+
+async def wait_until(predicate, timeout: float = 5.0):
+    # The server keeps a message just before the client reads its 250, so waits on delivery
+    # also wait for the dispatcher's own bookkeeping (pending, breaker) to catch up.
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached in time")
+        await asyncio.sleep(0.01)
+
+def test_delivers_over_one_reused_connection(app_module, mail_env, tmp_path):
+    mailer = make_dispatcher(app_module, tmp_path)
+
+    async def run():
+        await mailer.start()
+        try:
+            assert mailer.enqueue("First", "hello")
+            assert mailer.enqueue("Second", ".starts with a dot\n.\nand a lone dot line", reply_to="v@example.com")
+            await wait_until(lambda: len(mail_env.messages) == 2 and not mailer.pending)
+        finally:
+            await mailer.stop()
+
+    asyncio.run(run())
+    assert "Subject: First" in mail_env.messages[0]
+    # dot-stuffed on the wire, restored by the server
+    assert ".starts with a dot\n.\nand a lone dot line" in mail_env.messages[1].replace("\r\n", "\n")
+    assert "Reply-To: v@example.com" in mail_env.messages[1]
+    assert len(mail_env.sessions) == 1
+    assert outbox_files(tmp_path) == []
+
+def test_slow_server_hits_the_deadline_and_is_retried(app_module, mail_env, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "MAIL_SEND_DEADLINE", 0.2)
+    mail_env.rcpt_delay = 1.0
+    mailer = make_dispatcher(app_module, tmp_path)
+
+    async def run():
+        await mailer.start()
+        try:
+            mailer.enqueue("Slow", "body")
+            name = outbox_files(tmp_path)[0]
+            start = time.monotonic()
+            await wait_until(lambda: mailer.pending.get(name, {}).get("attempts", 0) >= 1)
+            assert time.monotonic() - start < 1.0  # gave up at the deadline, not when the server answered
+            assert mail_env.messages == []
+            assert outbox_files(tmp_path) == [name]
+            mail_env.rcpt_delay = 0.0
+            await wait_until(lambda: len(mail_env.messages) == 1 and not mailer.pending)
+        finally:
+            await mailer.stop()
+
+    asyncio.run(run())
+    assert outbox_files(tmp_path) == []
+
+def test_breaker_opens_on_failures_and_closes_after_a_good_trial(app_module, mail_env, tmp_path):
+    mail_env.rcpt_reply = "451 Try again later"
+    mailer = make_dispatcher(app_module, tmp_path, threshold=2, cooldown=0.5)
+
+    async def run():
+        await mailer.start()
+        try:
+            mailer.enqueue("Flaky", "body")
+            await wait_until(lambda: mailer.breaker.state == "open")
+            assert mailer.status()["breaker"] == "open"
+            attempts = mail_env.rcpt_attempts
+            await asyncio.sleep(0.3)
+            assert mail_env.rcpt_attempts == attempts  # nothing is sent while open
+            mail_env.rcpt_reply = None
+            await wait_until(lambda: len(mail_env.messages) == 1 and mailer.breaker.state == "closed")
+            assert mailer.breaker.failures == 0
+        finally:
+            await mailer.stop()
+
+    asyncio.run(run())
+
+def test_failed_trial_reopens_the_breaker(app_module):
+    breaker = app_module.CircuitBreaker(2, 0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+def test_outbox_survives_a_restart(app_module, mail_env, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "SMTP_PORT", free_port())  # nothing listening
+    down = make_dispatcher(app_module, tmp_path)
+
+    async def first_boot():
+        await down.start()
+        try:
+            down.enqueue("Kept", "survives restarts")
+            await wait_until(lambda: any(r["attempts"] for r in down.pending.values()))
+        finally:
+            await down.stop()
+
+    asyncio.run(first_boot())
+    assert len(outbox_files(tmp_path)) == 1
+    assert mail_env.messages == []
+
+    monkeypatch.setattr(app_module, "SMTP_PORT", mail_env.port)
+    up = make_dispatcher(app_module, tmp_path)
+
+    async def second_boot():
+        await up.start()
+        try:
+            await wait_until(lambda: len(mail_env.messages) == 1 and not up.pending)
+        finally:
+            await up.stop()
+
+    asyncio.run(second_boot())
+    assert "survives restarts" in mail_env.messages[0]
+    assert outbox_files(tmp_path) == []
+
+def test_only_the_leader_sends_and_another_takes_over(app_module, mail_env, tmp_path):
+    first = make_dispatcher(app_module, tmp_path)
+    second = make_dispatcher(app_module, tmp_path)
+
+    async def run():
+        await first.start()
+        await second.start()
+        try:
+            assert first.leader and not second.leader
+            second.enqueue("From follower", "picked up by the leader's rescan")
+            await wait_until(lambda: len(mail_env.messages) == 1 and not first.pending)
+            await first.stop()
+            await wait_until(lambda: second.leader)
+            second.enqueue("After takeover", "sent by the new leader")
+            await wait_until(lambda: len(mail_env.messages) == 2 and not second.pending)
+        finally:
+            await first.stop()
+            await second.stop()
+
+    asyncio.run(run())
+    assert outbox_files(tmp_path) == []
+
+def test_pages_stay_fast_while_smtp_is_slow(app_module, mail_env, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    def p99(client, requests: int = 50) -> float:
+        times = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            assert client.get("/").status_code == 200
+            times.append(time.perf_counter() - start)
+        return sorted(times)[int(len(times) * 0.99) - 1]
+
+    mailer = make_dispatcher(app_module, tmp_path)
+    monkeypatch.setattr(app_module, "MAILER", mailer)
+    with TestClient(app_module.app) as client:
+        baseline = p99(client)
+        mail_env.rcpt_delay = 1.0
+        posts = []
+        for i in range(5):
+            start = time.perf_counter()
+            r = client.post("/api/feedback", json={"name": "Slow", "email": "s@example.com", "message": f"while slow {i}"})
+            posts.append(time.perf_counter() - start)
+            assert r.status_code == 202
+        deadline = time.monotonic() + 5
+        while not mail_env.rcpt_attempts:  # a delivery is now stuck in RCPT
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        during = p99(client)
+    assert max(posts) < 0.5
+    assert during < max(0.25, baseline * 5)
+
+def test_line_breaks_in_the_name_do_not_stop_delivery(app_module, mail_env, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    mailer = make_dispatcher(app_module, tmp_path)
+    monkeypatch.setattr(app_module, "MAILER", mailer)
+    with TestClient(app_module.app) as client:
+        for name, message in (("Eve\r\nBcc: victim@example.com", "header injection"), ("Bob", "sent after it")):
+            r = client.post("/api/feedback", json={"name": name, "email": "e@example.com", "message": message})
+            assert r.status_code == 202
+        deadline = time.monotonic() + 5
+        while len(mail_env.messages) < 2 or mailer.pending:
+            assert time.monotonic() < deadline, "later mail was not delivered"
+            time.sleep(0.01)
+    first = mail_env.messages[0].replace("\r\n", "\n")
+    assert "Subject: [Portfolio] New feedback from Eve Bcc: victim@example.com\n" in first
+    assert "\nBcc:" not in first
+
+def test_unbuildable_outbox_record_is_set_aside(app_module, mail_env, tmp_path):
+    mailer = make_dispatcher(app_module, tmp_path)
+    os.makedirs(tmp_path / "outbox")
+    mailer._write("00000000000000000001-broken.json", {"subject": "no body", "attempts": 0, "next_attempt": 0.0})
+
+    async def run():
+        await mailer.start()
+        try:
+            mailer.enqueue("Fine", "still delivered")
+            await wait_until(lambda: len(mail_env.messages) == 1 and not mailer.pending)
+        finally:
+            await mailer.stop()
+
+    asyncio.run(run())
+    assert "still delivered" in mail_env.messages[0]
+    assert os.path.exists(tmp_path / "outbox" / "00000000000000000001-broken.dead")
+
+def dead_files(tmp_path) -> list:
+    return sorted(n for n in os.listdir(tmp_path / "outbox") if n.endswith(".dead"))
+
+def test_permanent_rejections_do_not_trip_the_breaker(app_module, mail_env, tmp_path):
+    mail_env.reject_marker = "BLOCKED"
+    mailer = make_dispatcher(app_module, tmp_path, threshold=2)
+
+    async def run():
+        await mailer.start()
+        try:
+            for i in range(3):
+                mailer.enqueue(f"Bad {i}", "BLOCKED content")
+            mailer.enqueue("Good", "accepted content")
+            await wait_until(lambda: len(mail_env.messages) == 1 and not mailer.pending)
+        finally:
+            await mailer.stop()
+
+    asyncio.run(run())
+    assert "accepted content" in mail_env.messages[0]
+    assert len(dead_files(tmp_path)) == 3
+    assert mailer.breaker.state == "closed" and mailer.breaker.failures == 0
+
+def test_rejected_recipient_is_dead_lettered_at_once(app_module, mail_env, tmp_path):
+    mail_env.rcpt_reply = "550 5.1.1 No such user"
+    mailer = make_dispatcher(app_module, tmp_path, threshold=1)
+
+    async def run():
+        await mailer.start()
+        try:
+            mailer.enqueue("Nobody", "body")
+            await wait_until(lambda: not mailer.pending)
+        finally:
+            await mailer.stop()
+
+    asyncio.run(run())
+    assert mail_env.rcpt_attempts == 1
+    assert len(dead_files(tmp_path)) == 1
+    assert mailer.breaker.state == "closed"
+
+def test_rejected_digest_is_resent_as_single_messages(app_module, mail_env, tmp_path, monkeypatch):
+    monkeypatch.setattr(app_module, "MAIL_DIGEST_THRESHOLD", 0)  # every multi-message batch becomes a digest
+    mail_env.reject_marker = "BLOCKED"
+    mailer = make_dispatcher(app_module, tmp_path, threshold=2)
+
+    async def run():
+        for text in ("first fine", "BLOCKED one", "second fine"):
+            mailer.enqueue("Burst", text)
+        await mailer.start()
+        try:
+            await wait_until(lambda: not mailer.pending)
+        finally:
+            await mailer.stop()
+
+    asyncio.run(run())
+    assert sorted(m.split("\r\n\r\n", 1)[1].strip() for m in mail_env.messages) == ["first fine", "second fine"]
+    assert len(dead_files(tmp_path)) == 1
+    assert mailer.breaker.failures == 0
@@ -0,0 +1,36 @@
+import asyncio
+
+def raw_request(app_module, method: str, path: str):
+    """Send one request through the ASGI stack with an arbitrary method token, as h11 would pass it on."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+             "headers": [(b"host", b"test")], "client": ("127.0.0.1", 1), "server": ("test", 80)}
+    asyncio.run(app_module.app(scope, receive, send))
+
+def test_unknown_methods_share_one_label(app_module, client):
+    before = len(app_module.REQUEST_LATENCY)
+    for i in range(200):
+        raw_request(app_module, f"X{i}", "/nope")
+    methods = {method for method, _ in app_module.REQUEST_LATENCY}
+    assert not any(m.startswith("X") for m in methods)
+    assert ("other", "unmatched") in app_module.REQUEST_LATENCY
+    assert len(app_module.REQUEST_LATENCY) <= before + 1
+    assert 'method="other"' in client.get("/metrics").text
+
+def test_scrape_reports_the_cached_page_without_rendering(app_module, client, monkeypatch):
+    client.get("/")
+    page = app_module.MAIN_PAGE
+    page.invalidate()  # e.g. a new submission arrived since the last page view
+    renders = []
+    real = page._render
+    monkeypatch.setattr(page, "_render", lambda: (renders.append(1), real()))
+    text = client.get("/metrics").text
+    assert f"portfolio_main_page_bytes {page.cached_size()}" in text
+    assert page.cached_size() > 0
+    assert renders == []
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+def fixed_records(app_module, count: int):
+    # same widths everywhere, so any size difference comes from the number of entries embedded
+    received = 1_700_000_000 * 1_000_000
+    return [app_module.FeedbackRecord(f"Visitor {i % 10}", f"v{i % 10}@example.com", f"Message {i % 10:08d}", received)
+            for i in range(count)]
+
+@pytest.fixture
+def feedbacks(app_module, monkeypatch):
+    def install(records):
+        monkeypatch.setattr(app_module, "FEEDBACKS", records)
+        app_module.MAIN_PAGE.invalidate()
+    yield install
+    app_module.MAIN_PAGE.invalidate()
+
+def test_page_size_does_not_grow_with_stored_feedback(app_module, feedbacks):
+    sizes = {}
+    for count in (10, 100, 10_000, 100_000):
+        feedbacks(fixed_records(app_module, count))
+        sizes[count] = len(app_module.MAIN_PAGE.static().body)
+    # at most FEEDBACK_EMBED_RECENT cards are embedded, so the size stops growing there
+    assert app_module.FEEDBACK_EMBED_RECENT < 100
+    assert sizes[100] == sizes[10_000] == sizes[100_000]
+    assert sizes[10] < sizes[100]
+
+def test_feedback_pages_cover_every_entry_once(app_module):
+    records = fixed_records(app_module, 45)
+    pages = app_module.FeedbackPages(records, 8)
+    seen, cursor = 0, None
+    while True:
+        page = json.loads(pages.page(cursor, 20))
+        seen += len(page["items"])
+        cursor = page.get("next_cursor")
+        if cursor is None:
+            break
+    assert seen == 45
+
+@pytest.mark.parametrize("path", ["/", "/resume", "/sitemap.xml"])
+def test_compressed_variant_saves_bytes(client, path):
+    plain = client.get(path, headers={"accept-encoding": "identity"})
+    gz = client.get(path, headers={"accept-encoding": "gzip"})
+    assert plain.status_code == gz.status_code == 200
+    assert gz.headers["content-encoding"] == "gzip"
+    assert gz.headers["vary"] == "Accept-Encoding"
+    assert "cache-control" in gz.headers
+    assert gz.num_bytes_downloaded < plain.num_bytes_downloaded
+    assert gz.content == plain.content  # same document once decoded
+    assert gz.headers["etag"] != plain.headers["etag"]
+
+@pytest.mark.parametrize("path", ["/", "/resume", "/robots.txt", "/sitemap.xml"])
+def test_matching_etag_answers_bodyless_304(client, path):
+    first = client.get(path, headers={"accept-encoding": "gzip"})
+    cached = client.get(path, headers={"accept-encoding": "gzip", "if-none-match": first.headers["etag"]})
+    assert cached.status_code == 304
+    assert cached.num_bytes_downloaded == 0
+    assert cached.headers["etag"] == first.headers["etag"]
+    assert client.get(path, headers={"if-none-match": '"stale"'}).status_code == 200
+
+def test_304_does_not_encode_a_body(app_module):
+    body = app_module.StaticBody(b"x" * 10_000, "text/plain")
+    etag = body.variants["gzip"][1]
+
+    class FakeRequest:
+        headers = {"accept-encoding": "gzip", "if-none-match": f'W/{etag}'}
+
+    response = body.respond(FakeRequest())
+    assert response.status_code == 304
+    assert response.body == b""
+    assert len(body.variants["gzip"][0]) < 100
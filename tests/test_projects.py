@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+CATALOG = [
+    {"id": "a", "title": "Sales Forecasting", "summary": "Time series forecast of retail sales", "tags": ["Python"], "year": 2023},
+    {"id": "b", "title": "Churn Dashboard", "summary": "Customer churn dashboard in Power BI", "tags": ["PowerBI"], "year": 2024},
+    {"id": "c", "title": "Sales Dashboard", "summary": "Regional sales dashboard with drill-down", "tags": ["Python", "SQL"], "year": 2024},
+]
+
+@pytest.fixture
+def index(app_module):
+    return app_module.ProjectIndex(CATALOG)
+
+def ids(body: bytes) -> list:
+    return [p["id"] for p in json.loads(body)["items"]]
+
+def test_prefix_matches_longer_tokens(index):
+    assert ids(index.search("forec")) == ["a"]
+    assert sorted(ids(index.search("dash"))) == ["b", "c"]
+
+def test_all_terms_must_match(index):
+    assert ids(index.search("sales dash")) == ["c"]
+    assert ids(index.search("churn forecast")) == []
+    assert json.loads(index.search("sales dash"))["total"] == 1
+
+def test_empty_query_lists_everything_in_order(index):
+    assert ids(index.search("")) == ["a", "b", "c"]
+    assert ids(index.search("   ", limit=2, offset=1)) == ["b", "c"]
+    assert json.loads(index.search(""))["total"] == 3
+
+def test_tag_and_year_filters_combine_with_terms(index):
+    assert ids(index.search("", tag="python", year="2024")) == ["c"]
+    assert ids(index.search("sales", tag="python")) in (["a", "c"], ["c", "a"])
+
+def test_search_endpoint(app_module, client, monkeypatch):
+    monkeypatch.setattr(app_module, "PROJECT_INDEX", app_module.ProjectIndex(CATALOG))
+    r = client.get("/api/projects", params={"q": "sal dash"})
+    assert r.status_code == 200
+    assert ids(r.content) == ["c"]
+    assert json.loads(client.get("/api/projects").content)["total"] == 3
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from conftest import ROOT
+
+def test_import_does_not_load_numpy():
+    code = "import sys, portfolio_fastapi_final3 as m; print('numpy' in sys.modules, m.RELATED_PROJECTS is None)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "True"]
+
+def test_endpoint_answers_503_until_built(app_module, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    async def not_yet():
+        pass
+
+    monkeypatch.setattr(app_module, "RELATED_PROJECTS", None)
+    monkeypatch.setattr(app_module, "load_related_projects", not_yet)
+    with TestClient(app_module.app) as client:
+        r = client.get(f"/api/projects/{app_module.PROJECTS[0]['id']}/related")
+    assert r.status_code == 503
+    assert r.headers["retry-after"] == "1"
+
+def test_background_build_adds_links_to_the_page(app_module, client):
+    pytest.importorskip("numpy")
+    deadline = time.monotonic() + 10
+    while app_module.RELATED_PROJECTS is None:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    pid = app_module.PROJECTS[0]["id"]
+    r = client.get(f"/api/projects/{pid}/related")
+    assert r.status_code == 200
+    assert r.json()["related"]
+    assert "Related: " in client.get("/").text
+    assert client.get("/api/projects/no-such-project/related").status_code == 404
@@ -0,0 +1,40 @@
+import datetime
+import os
+import sys
+import types
+
+def test_resume_hash_is_stable_across_clock_changes(app_module, monkeypatch):
+    skills, certs = app_module.SKILLS_TECHNICAL + app_module.SKILLS_TOOLS, app_module.CERTIFICATES
+    first = app_module.resume_hash(app_module.build_resume_html(skills, certs))
+
+    class LaterDatetime(datetime.datetime):
+        @classmethod
+        def utcnow(cls):
+            return datetime.datetime(2099, 1, 1, 12, 34)
+
+    monkeypatch.setattr(app_module.datetime, "datetime", LaterDatetime)
+    assert app_module.resume_hash(app_module.build_resume_html(skills, certs)) == first
+    assert app_module.resume_hash(app_module.build_resume_html(skills + ["New skill"], certs)) != first
+
+def test_rebuilt_resume_keeps_its_etag(app_module, client):
+    served = client.get("/resume", headers={"accept-encoding": "identity"}).headers["etag"]
+    rebuilt = app_module.build_resume_body(app_module.build_resume_html(
+        app_module.SKILLS_TECHNICAL + app_module.SKILLS_TOOLS, app_module.CERTIFICATES))
+    assert rebuilt.variants["identity"][1] == served
+
+def test_new_pdf_rendition_replaces_old_ones(app_module, tmp_path, monkeypatch):
+    fake = types.ModuleType("weasyprint")
+
+    class HTML:
+        def __init__(self, string):
+            self.string = string
+
+        def write_pdf(self):
+            return b"%PDF-fake"
+
+    fake.HTML = HTML
+    monkeypatch.setitem(sys.modules, "weasyprint", fake)
+    monkeypatch.setattr(app_module, "RESUME_PDF_DIR", str(tmp_path))
+    (tmp_path / "resume-0123456789abcdef.pdf").write_bytes(b"old")
+    assert app_module.render_resume_pdf() == b"%PDF-fake"
+    assert os.listdir(tmp_path) == [f"resume-{app_module.RESUME_HASH}.pdf"]
@@ -0,0 +1,50 @@
+def make_page(app_module, segment, entries: list, state: dict, boot: str, monkeypatch):
+    monkeypatch.setattr(app_module, "BOOT_TOKEN", boot)
+    template = app_module.Template("<ul>{items|safe}</ul>")
+    return app_module.MainPage(template, {"items": lambda: "".join(f"<li>{e}</li>" for e in entries)},
+                               state=lambda: state["value"], shared=segment)
+
+def test_page_from_an_earlier_boot_is_not_adopted(app_module, tmp_path, monkeypatch):
+    segment = app_module.SharedSegment(str(tmp_path / "page.shm"), 1 << 16)
+    old = make_page(app_module, segment, ["a", "b", "c"], {"value": "300:3"}, "boot-1", monkeypatch)
+    assert b"<li>c</li>" in old.static().body
+
+    # restarted after the store was cleared: one new entry, smaller state
+    fresh = make_page(app_module, app_module.SharedSegment(str(tmp_path / "page.shm"), 1 << 16),
+                      ["new"], {"value": "100:1"}, "boot-2", monkeypatch)
+    assert fresh.static().body == b"<ul><li>new</li></ul>"
+
+def test_same_boot_adopts_only_an_exactly_matching_state(app_module, tmp_path, monkeypatch):
+    path = str(tmp_path / "page.shm")
+    state = {"value": "200:2"}
+    first = make_page(app_module, app_module.SharedSegment(path, 1 << 16), ["a", "b"], state, "boot", monkeypatch)
+    first.static()
+
+    renders = []
+    entries = ["x"]
+    second = make_page(app_module, app_module.SharedSegment(path, 1 << 16), entries, state, "boot", monkeypatch)
+    real_render = second._render
+    second._render = lambda: (renders.append(1), real_render())
+    assert second.static().body == b"<ul><li>a</li><li>b</li></ul>"  # same state: adopted
+    assert renders == []
+
+    # a state that is merely "larger" (e.g. a spam line deleted and more posted) is not enough
+    other = make_page(app_module, app_module.SharedSegment(path, 1 << 16), ["y"], {"value": "150:2"}, "boot",
+                      monkeypatch)
+    assert other.static().body == b"<ul><li>y</li></ul>"
+
+def test_embed_setting_is_part_of_the_fingerprint(app_module, monkeypatch):
+    template = app_module.Template("{items|safe}")
+    before = app_module.MainPage(template, {}).fingerprint
+    monkeypatch.setattr(app_module, "FEEDBACK_EMBED_RECENT", app_module.FEEDBACK_EMBED_RECENT + 1)
+    assert app_module.MainPage(template, {}).fingerprint != before
+
+def test_state_tracks_store_position(app_module, tmp_path):
+    log = app_module.FeedbackLog(str(tmp_path / "log.jsonl"))
+    log.append({"name": "a", "email": "", "message": "one"})
+    log.load_all()
+    first = log.position()
+    log.append({"name": "b", "email": "", "message": "two"})
+    log.read_new()
+    assert log.position() > first
+    log.close()
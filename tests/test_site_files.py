@@ -0,0 +1,37 @@
+import re
+
+import pytest
+
+@pytest.fixture
+def site(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "SITE_URL", "")
+    monkeypatch.setattr(app_module, "SITE_FILES", app_module.SiteFiles(app_module.SITE_FILES_MAX_HOSTS))
+
+def test_robots_points_at_the_absolute_sitemap_for_each_host(client, site):
+    assert client.get("/robots.txt", headers={"Host": "example.com"}).text.splitlines()[-1] == \
+        "Sitemap: http://example.com/sitemap.xml"
+    assert "Sitemap: http://other.example:8080/sitemap.xml" in client.get(
+        "/robots.txt", headers={"Host": "other.example:8080"}).text
+
+def test_sitemap_lists_pages_and_project_anchors(app_module, client, site):
+    xml = client.get("/sitemap.xml", headers={"Host": "example.com"}).text
+    locs = re.findall(r"<loc>([^<]+)</loc>", xml)
+    assert "http://example.com/" in locs and "http://example.com/resume" in locs
+    for p in app_module.PROJECTS:
+        assert f"http://example.com/#project-{p['id']}" in locs
+    assert not any("/api/" in loc or loc.endswith("/metrics") for loc in locs)
+
+def test_site_url_setting_wins_over_the_host(app_module, client, site, monkeypatch):
+    monkeypatch.setattr(app_module, "SITE_URL", "https://divytosh.example")
+    assert "Sitemap: https://divytosh.example/sitemap.xml" in client.get("/robots.txt", headers={"Host": "evil.test"}).text
+
+@pytest.mark.parametrize("host", ["evil.test/<script>", "a b", "x" * 300, "example.com:123456", "", "exa_mple.com"])
+def test_malformed_or_oversized_hosts_are_not_echoed(client, site, host):
+    text = client.get("/robots.txt", headers={"Host": host}).text
+    assert text.splitlines()[-1] == "Sitemap: http://127.0.0.1:8000/sitemap.xml"
+
+def test_forwarded_host_only_from_trusted_proxies(app_module, client, site, monkeypatch):
+    headers = {"Host": "internal:10000", "X-Forwarded-Host": "public.example", "X-Forwarded-Proto": "https"}
+    assert "Sitemap: http://internal:10000/" in client.get("/robots.txt", headers=headers).text
+    monkeypatch.setattr(app_module, "is_trusted_proxy", lambda host: True)  # TestClient's peer is "testclient"
+    assert "Sitemap: https://public.example/" in client.get("/robots.txt", headers=headers).text
@@ -0,0 +1,37 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+
+pytest.importorskip("numpy")
+
+HAM = ["Loved the sales dashboard, would like to chat about a role", "Great portfolio, the HR analytics work is neat",
+       "Could you share more about the cancer detection model?", "Nice work on the IPL dashboard"]
+SPAM = ["CHEAP VIAGRA buy now http://spam.example click here", "Earn $$$ fast!!! crypto casino bonus click now",
+        "SEO backlinks cheap, buy 1000 backlinks now http://seo.example", "Win a free iPhone!!! click http://win.example"]
+
+def test_trained_model_loads_and_scores(app_module, tmp_path):
+    data = tmp_path / "labeled.jsonl"
+    with open(data, "w", encoding="utf-8") as f:
+        for texts, label in ((HAM, 0), (SPAM, 1)):
+            for text in texts * 3:
+                f.write(json.dumps({"name": "x", "email": "", "message": text, "spam": label}) + "\n")
+    out = tmp_path / "model.npz"
+    # a fresh interpreter, as the script is normally run: numpy is not yet loaded by the app
+    run = subprocess.run([sys.executable, f"{ROOT}/train_spam_model.py", str(data), "--out", str(out),
+                          "--bits", "12", "--epochs", "60"], cwd=tmp_path, capture_output=True, text=True, timeout=120)
+    assert run.returncode == 0, run.stderr[-2000:]
+    assert "holdout @ 0.50" in run.stdout
+
+    model = app_module.SpamModel(str(out))
+    assert model.enabled and model.bits == 12 and model.ngrams == (3, 4, 5)
+    scores = model.score([app_module.spam_text({"name": "x", "message": t}) for t in HAM + SPAM])
+    assert max(scores[:len(HAM)]) < min(scores[len(HAM):])
+
+def test_features_load_numpy_themselves(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "np", None)
+    docs, buckets, norms = app_module.spam_features(["hello there"], 10, (3,))
+    assert len(docs) == len(buckets) == 9 and len(norms) == 1
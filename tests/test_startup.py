@@ -0,0 +1,28 @@
+"""
+Cold start: importing the app must stay cheap even with a large feedback store,
+leaving loading, numpy and mail to run after the server is up.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+IMPORT_SELF_TIME_MAX_MS = 300  # measured ~50 ms; loading the 100k-record store below would take several times that
+DEFERRED_MODULES = ("numpy", "httpx", "smtplib", "weasyprint", "aiosmtpd")
+
+def test_import_is_fast_and_defers_heavy_modules(tmp_path):
+    record = json.dumps({"name": "n", "email": "", "message": "m" * 100, "_received_at": "2026-01-01T00:00:00Z"})
+    with open(tmp_path / "submissions.jsonl", "w", encoding="utf-8") as f:
+        f.write((record + "\n") * 100_000)
+    code = ("import sys, portfolio_fastapi_final3 as m; "
+            f"print([n for n in {DEFERRED_MODULES!r} if n in sys.modules], len(m.FEEDBACKS))")
+    env = {k: v for k, v in os.environ.items() if not k.startswith(("SMTP_", "CONTENT_", "FEEDBACK_"))}
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=tmp_path,
+                         env=dict(env, PYTHONPATH=ROOT), capture_output=True, text=True, timeout=120)
+    assert out.returncode == 0, out.stderr[-2000:]
+    assert out.stdout.strip().splitlines()[-1] == "[] 0"
+    self_us = [int(line.split("|")[0].split(":")[1]) for line in out.stderr.splitlines()
+               if line.rstrip().endswith("| portfolio_fastapi_final3")]
+    assert self_us and self_us[0] / 1000 < IMPORT_SELF_TIME_MAX_MS, self_us
@@ -0,0 +1,124 @@
+"""
+Train the spam model used by portfolio_fastapi_final3 (SPAM_MODEL_FILE).
+
+Run:
+    pip install numpy
+    python train_spam_model.py labeled.jsonl --out spam_model.npz
+    python train_spam_model.py labeled.csv --bits 18 --ngrams 3 4 5 --epochs 150
+
+Input:
+    JSON Lines or CSV with a label column "spam" (1/0, true/false, spam/ham) and either
+    name/email/message fields (e.g. the app's own export, labeled) or a single "text" field.
+
+Notes:
+- Features are the app's own hashed character n-grams (spam_features), so training and
+  serving always agree; the model is logistic regression fitted by full-batch Adagrad
+  with L2 regularization and balanced class weights.
+- A --holdout share is kept back and precision/recall are reported at 0.5 and at the
+  app's SPAM_THRESHOLD before the model is trained again on everything and saved.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import time
+
+os.environ.setdefault("SHARED_PAGE_FILE", "")  # importing the app must not map the page file
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import numpy as np
+import portfolio_fastapi_final3 as app
+
+app.load_numpy()  # the app imports numpy lazily; its feature code uses the module-level np
+
+def parse_label(value) -> int:
+    return int(str(value).strip().lower() in ("1", "true", "yes", "spam"))
+
+def load_examples(path: str):
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    texts = [r["text"] if "text" in r and "message" not in r else app.spam_text(r) for r in rows]
+    labels = [parse_label(r.get("spam", r.get("label", 0))) for r in rows]
+    return texts, labels
+
+def train(texts, labels, bits: int = 18, ngrams=(3, 4, 5), epochs: int = 150, lr: float = 0.5, l2: float = 1e-6):
+    """Return (weights, bias) for app.SpamModel."""
+    docs, buckets, norms = app.spam_features(texts, bits, tuple(ngrams))
+    y = np.asarray(labels, dtype=np.float64)
+    n, dim = len(texts), 1 << bits
+    pos = max(y.sum(), 1.0)
+    neg = max(n - y.sum(), 1.0)
+    sample_weight = np.where(y == 1, n / (2 * pos), n / (2 * neg))
+    values = norms[docs]
+    w = np.zeros(dim)
+    b = float(np.log(pos / neg))
+    acc_w = np.full(dim, 1e-8)
+    acc_b = 1e-8
+    for _ in range(epochs):
+        logits = b + np.bincount(docs, weights=w[buckets] * values, minlength=n)
+        err = (1.0 / (1.0 + np.exp(-logits)) - y) * sample_weight
+        grad_w = np.bincount(buckets, weights=err[docs] * values, minlength=dim) / n + l2 * w
+        grad_b = err.mean()
+        acc_w += grad_w ** 2
+        acc_b += grad_b ** 2
+        w -= lr * grad_w / np.sqrt(acc_w)
+        b -= lr * grad_b / np.sqrt(acc_b)
+    return w.astype(np.float32), b
+
+def save_model(path: str, weights, bias: float, ngrams):
+    np.savez_compressed(path, weights=weights, bias=np.float64(bias), ngrams=np.asarray(ngrams, dtype=np.int64))
+
+def evaluate(model: "app.SpamModel", texts, labels, threshold: float) -> dict:
+    scores = np.asarray(model.score(texts))
+    y = np.asarray(labels)
+    flagged = scores >= threshold
+    tp = int((flagged & (y == 1)).sum())
+    return {
+        "accuracy": float((flagged == (y == 1)).mean()) if len(y) else 0.0,
+        "precision": tp / max(int(flagged.sum()), 1),
+        "recall": tp / max(int((y == 1).sum()), 1),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the feedback spam model.")
+    parser.add_argument("data", help="labeled .jsonl or .csv")
+    parser.add_argument("--out", default=app.SPAM_MODEL_FILE)
+    parser.add_argument("--bits", type=int, default=18, help="hash space is 2**bits weights")
+    parser.add_argument("--ngrams", type=int, nargs="+", default=[3, 4, 5])
+    parser.add_argument("--epochs", type=int, default=150)
+    parser.add_argument("--lr", type=float, default=0.5)
+    parser.add_argument("--l2", type=float, default=1e-6)
+    parser.add_argument("--holdout", type=float, default=0.2, help="share kept back for evaluation (0 to skip)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    texts, labels = load_examples(args.data)
+    print(f"{len(texts)} examples, {sum(labels)} spam")
+    if args.holdout > 0:
+        order = list(range(len(texts)))
+        random.Random(args.seed).shuffle(order)
+        cut = int(len(order) * (1 - args.holdout))
+        train_idx, test_idx = order[:cut], order[cut:]
+        weights, bias = train([texts[i] for i in train_idx], [labels[i] for i in train_idx],
+                              args.bits, args.ngrams, args.epochs, args.lr, args.l2)
+        tmp = args.out + ".eval.npz"
+        save_model(tmp, weights, bias, args.ngrams)
+        try:
+            model = app.SpamModel(tmp)
+            for threshold in (0.5, app.SPAM_THRESHOLD):
+                res = evaluate(model, [texts[i] for i in test_idx], [labels[i] for i in test_idx], threshold)
+                print(f"holdout @ {threshold:.2f}: " + "  ".join(f"{k} {v:.3f}" for k, v in res.items()))
+        finally:
+            os.remove(tmp)
+    start = time.perf_counter()
+    weights, bias = train(texts, labels, args.bits, args.ngrams, args.epochs, args.lr, args.l2)
+    save_model(args.out, weights, bias, args.ngrams)
+    print(f"trained in {time.perf_counter() - start:.1f}s -> {args.out}")
+
+if __name__ == "__main__":
+    main()